@@ -0,0 +1,146 @@
+"""
+    This module contains a NumPy batch engine for the simulation in poker.main
+
+    Decks are shuffled many at a time as an (N, 52) array of card ordinals, hands
+    are dealt by slicing, and every hand in the batch is classified at once by
+    running the bitwise logic of evaluator.evaluate over arrays of suit masks.
+
+    Note: Using Python 3.9.0
+"""
+import numpy as np
+
+import evaluator
+from poker import Hist, print_report
+
+
+# the evaluator lookup tables as arrays, so they can be indexed by arrays of masks
+POPCOUNT = np.array(evaluator.POPCOUNT, dtype=np.int8)
+STRAIGHT_FLAGS = np.array(evaluator.STRAIGHT_FLAGS, dtype=np.int64)
+FLUSH_FLAGS = np.array(evaluator.FLUSH_FLAGS, dtype=np.int64)
+
+
+def shuffle_decks(rng, num_decks):
+    """
+        Shuffles a batch of decks
+
+        rng: numpy.random.Generator
+        num_decks: int
+
+        return: array of shape (num_decks, 52); each row is a permutation of the card ordinals
+    """
+    decks = np.tile(np.arange(52, dtype=np.uint8), (num_decks, 1))
+    return rng.permuted(decks, axis=1)
+
+
+def deal_batch(decks, num_cards=5, num_hands=10):
+    """
+        Deals hands from a batch of shuffled decks
+
+        decks: array of shape (num_decks, 52)
+        num_cards: cards per hand
+        num_hands: hands per deck
+
+        return: array of shape (num_decks * num_hands, num_cards)
+    """
+    if num_cards * num_hands > 52:
+        raise ValueError("cannot deal %d hands of %d cards from one deck" % (num_hands, num_cards))
+    return decks[:, :num_cards * num_hands].reshape(-1, num_cards)
+
+
+def suit_masks(hands):
+    """
+        Computes the rank mask of each suit in each hand
+
+        hands: array of shape (num_hands, num_cards) of card ordinals
+
+        return: array of shape (4, num_hands); one 13-bit rank mask per suit
+    """
+    hands = hands.astype(np.int64)
+    suits = hands // 13
+    bits = np.left_shift(1, hands % 13)
+    masks = np.zeros((4, len(hands)), dtype=np.int64)
+    for suit in range(4):
+        masks[suit] = np.where(suits == suit, bits, 0).sum(axis=1)
+    return masks
+
+
+def classify_batch(hands):
+    """
+        Classifies a batch of hands; the vectorized form of evaluator.evaluate
+
+        hands: array of shape (num_hands, num_cards) of distinct card ordinals, num_cards >= 5
+
+        return: array of shape (num_hands,); the category flags of each hand
+    """
+    if hands.shape[1] < 5:
+        raise ValueError("the batch classifier needs at least 5 cards per hand")
+    c, d, h, s = suit_masks(hands)
+
+    flags = (STRAIGHT_FLAGS[c | d | h | s]
+             | FLUSH_FLAGS[c] | FLUSH_FLAGS[d] | FLUSH_FLAGS[h] | FLUSH_FLAGS[s])
+    flags |= 1 << evaluator.HIGHCARD
+
+    pairs = (c & d) | (c & h) | (c & s) | (d & h) | (d & s) | (h & s)
+    trips = (c & d & (h | s)) | ((c | d) & h & s)
+    two = POPCOUNT[pairs] >= 2
+
+    flags |= np.where(pairs != 0, 1 << evaluator.PAIR, 0)
+    flags |= np.where(two, 1 << evaluator.TWOPAIR, 0)
+    flags |= np.where(trips != 0, 1 << evaluator.THREEKIND, 0)
+    flags |= np.where((trips != 0) & two, 1 << evaluator.FULLHOUSE, 0)
+    flags |= np.where((c & d & h & s) != 0, 1 << evaluator.FOURKIND, 0)
+    return flags
+
+
+def label_counts(flags, lhist=None):
+    """
+        Counts how many hands in a batch have each label
+
+        flags: array returned by classify_batch
+        lhist: Hist to add the counts to; by default, a new one
+
+        return: Hist; map from label to number of occurrences
+    """
+    if lhist is None:
+        lhist = Hist()
+    for category, label in enumerate(evaluator.CATEGORIES):
+        lhist.count(label, int(np.count_nonzero(flags & (1 << category))))
+    return lhist
+
+
+def simulate(n, num_cards=7, num_hands=7, batch_size=10000, seed=None, lhist=None):
+    """
+        Deals num_hands hands of num_cards cards from each of n shuffled decks
+
+        n: number of decks
+        num_cards: cards per hand
+        num_hands: hands per deck
+        batch_size: number of decks shuffled at once
+        seed: seed for numpy.random.default_rng, or a Generator
+        lhist: Hist to add the counts to; by default, a new one
+
+        return: Hist; map from label to number of occurrences
+    """
+    rng = np.random.default_rng(seed)
+    if lhist is None:
+        lhist = Hist()
+    done = 0
+    while done < n:
+        size = min(batch_size, n - done)
+        hands = deal_batch(shuffle_decks(rng, size), num_cards, num_hands)
+        label_counts(classify_batch(hands), lhist)
+        done += size
+    return lhist
+
+
+def main():
+    """
+        Runs the simulation in poker.main with a thousand times as many decks
+    """
+    n = 10000000
+    lhist = simulate(n, 7, 7)
+    print_report(lhist, 7.0 * n)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""
+    This module contains a benchmark suite for the cards, decks and poker hands
+
+    Each benchmark reports the best time per operation over several repeats.
+    Results can be written to a JSON baseline and compared with a stored one;
+    any benchmark slower than the baseline by more than the threshold is
+    reported as a regression and makes the script exit with status 1.
+
+        python benchmark.py --output baseline.json
+        python benchmark.py --compare baseline.json --threshold 0.1
+
+    Note: Using Python 3.9.0
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import timeit
+
+import deal_hands
+import evaluator
+import poker
+
+
+# a 7-card hand whose best category is each label, as (suit, rank) pairs
+CATEGORY_HANDS = {
+    'straightflush': [(2, 5), (2, 6), (2, 7), (2, 8), (2, 9), (0, 1), (1, 13)],
+    'fourkind': [(0, 9), (1, 9), (2, 9), (3, 9), (0, 2), (1, 5), (2, 12)],
+    'fullhouse': [(0, 4), (1, 4), (2, 4), (0, 11), (3, 11), (1, 2), (2, 7)],
+    'flush': [(1, 2), (1, 6), (1, 9), (1, 11), (1, 13), (0, 3), (2, 3)],
+    'straight': [(0, 10), (1, 11), (2, 12), (3, 13), (0, 1), (1, 4), (2, 6)],
+    'threekind': [(0, 7), (1, 7), (2, 7), (3, 2), (0, 10), (1, 12), (2, 4)],
+    'twopair': [(0, 3), (1, 3), (2, 8), (3, 8), (0, 12), (1, 1), (2, 5)],
+    'pair': [(0, 6), (1, 6), (2, 2), (3, 9), (0, 11), (1, 13), (2, 4)],
+    'highcard': [(0, 2), (1, 3), (2, 5), (3, 7), (0, 9), (1, 11), (2, 13)],
+}
+
+
+def time_per_op(stmt, setup=None, number=None, repeat=5):
+    """
+        Times a callable, returning the best time per call
+
+        stmt: callable to time
+        setup: callable run before each repeat, untimed
+        number: calls per repeat; by default, enough to take about 0.2 seconds
+        repeat: number of repeats
+
+        return: float; seconds per call
+    """
+    timer = timeit.Timer(stmt, setup or (lambda: None))
+    if number is None:
+        number, elapsed = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def bench_cards():
+    """
+        Times card comparisons and sorting a shuffled deck
+
+        return: dict; map from benchmark name to seconds per operation
+    """
+    rng = random.Random(1)
+    cards = list(poker.Card.all_cards)
+    pairs = [(rng.choice(cards), rng.choice(cards)) for i in range(1000)]
+
+    def compare():
+        for a, b in pairs:
+            a < b
+
+    deck = poker.Deck()
+
+    def unsort():
+        deck.shuffle(rng)
+
+    return {
+        'card_compare_1000': time_per_op(compare),
+        'deck_sort': time_per_op(deck.sort, unsort, number=1),
+    }
+
+
+def bench_decks():
+    """
+        Times building, resetting, shuffling and moving cards out of decks
+
+        return: dict; map from benchmark name to seconds per operation
+    """
+    rng = random.Random(2)
+    deck = poker.Deck()
+    hand = poker.Hand()
+
+    def move():
+        deck.reset()
+        hand.reset()
+        deck.move_cards(hand, 5)
+
+    return {
+        'deck_construct': time_per_op(poker.Deck),
+        'deck_reset': time_per_op(deck.reset),
+        'deck_shuffle': time_per_op(lambda: deck.shuffle(rng)),
+        'deck_shuffle_5': time_per_op(lambda: deck.shuffle(rng, 5)),
+        'move_cards_5': time_per_op(move),
+    }
+
+
+def bench_dealing():
+    """
+        Times both deal_hands implementations
+
+        return: dict; map from benchmark name to seconds per operation
+    """
+    def deal_plain():
+        deal_hands.Deck().deal_hands(6, 5)
+
+    def deal_poker():
+        poker.PokerDeck().deal_hands(7, 7)
+
+    return {
+        'deal_hands_6x5': time_per_op(deal_plain),
+        'pokerdeck_deal_hands_7x7': time_per_op(deal_poker),
+    }
+
+
+def bench_classify():
+    """
+        Times PokerHand.classify on a hand of each category
+
+        return: dict; map from benchmark name to seconds per operation
+    """
+    results = {}
+    for label, cards in CATEGORY_HANDS.items():
+        hand = poker.PokerHand()
+        for suit, rank in cards:
+            hand.add_card(poker.Card(suit, rank))
+        best = evaluator.CATEGORIES[evaluator.category(evaluator.evaluate(hand.mask))]
+        assert best == label, (label, best)
+        results['classify_' + label] = time_per_op(hand.classify)
+    return results
+
+
+def bench_simulate(n=2000):
+    """
+        Times the simulation in poker.main
+
+        n: number of decks
+
+        return: dict; map from benchmark name to seconds per operation
+    """
+    rng = random.Random(3)
+    seconds = time_per_op(lambda: poker.simulate(n, 7, 7, rng), number=1, repeat=3)
+    return {'simulate_per_hand': seconds / (7 * n)}
+
+
+def run_all():
+    """
+        Runs every benchmark
+
+        return: dict; map from benchmark name to seconds per operation
+    """
+    results = {}
+    for bench in (bench_cards, bench_decks, bench_dealing, bench_classify, bench_simulate):
+        results.update(bench())
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+        Finds the benchmarks that got slower than the baseline by more than the threshold
+
+        results: dict; map from benchmark name to seconds per operation
+        baseline: dict; the same, from a stored run
+        threshold: float; allowed slowdown, as a fraction
+
+        return: list of tuple (name, old seconds, new seconds)
+    """
+    regressions = []
+    for name, seconds in sorted(results.items()):
+        old = baseline.get(name)
+        if old and seconds > old * (1 + threshold):
+            regressions.append((name, old, seconds))
+    return regressions
+
+
+def main():
+    """
+        Runs the benchmarks, then saves and/or compares them
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='compare the results with this JSON baseline')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='allowed slowdown before a benchmark counts as a regression')
+    args = parser.parse_args()
+
+    results = run_all()
+    for name, seconds in sorted(results.items()):
+        print('%-30s %12.3f us' % (name, seconds * 1e6))
+    print('%-30s %12.0f' % ('simulate_hands_per_second', 1 / results['simulate_per_hand']))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'python': platform.python_version(), 'results': results}, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for name, old, new in regressions:
+            print('REGRESSION %s: %.3f us -> %.3f us (%+.1f%%)'
+                  % (name, old * 1e6, new * 1e6, (new / old - 1) * 100))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
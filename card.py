@@ -15,23 +15,82 @@ class Card:
     """
         Represents a playing card
 
+        Cards are flyweights: there are exactly 52 instances, created once when
+        the module is imported, and Card(suit, rank) returns the shared instance.
+        Each card stores a single ordinal, suit * 13 + (rank - 1), so the ordinals
+        run 0-51 in the same order as (suit, rank).
+
         attributes: 
-            suit: integer (0-3)
-            rank: integer (1-13)
+            ordinal: integer (0-51); read-only, since every card is shared
+            suit: integer (0-3); derived from ordinal
+            rank: integer (1-13); derived from ordinal
     """
+    __slots__ = ('_ordinal',)
+
     suit_names = ["Clubs", "Diamonds", "Hearts", "Spades"]
     rank_names = [None, "Ace", "2", "3", "4", "5", "6", "7", "8", "9", "10", "Jack", "Queen", "King"]
 
+    # the 52 interned cards, indexed by ordinal; filled in below the class
+    all_cards = ()
+
+    # the human-readable name of each card, indexed by ordinal; filled in below the class
+    names = ()
+
 
-    def __init__(self, suit = 0, rank = 0):
+    def __new__(cls, suit = 0, rank = 1):
         """
-            Initializes the object when instantiated
+            Returns the interned card for the given suit and rank
 
             suit: int
             rank: int
+
+            return: Card
+        """
+        if not (0 <= suit < 4 and 1 <= rank < 14):
+            raise ValueError("invalid card: suit %r, rank %r" % (suit, rank))
+        return Card.all_cards[suit * 13 + rank - 1]
+
+
+    @classmethod
+    def from_ordinal(cls, ordinal):
+        """
+            Returns the interned card with the given ordinal
+
+            ordinal: int (0-51)
+
+            return: Card
+        """
+        return Card.all_cards[ordinal]
+
+
+    @property
+    def ordinal(self):
         """
-        self.suit = suit
-        self.rank = rank
+            The ordinal of the card, suit * 13 + (rank - 1)
+
+            return: int
+        """
+        return self._ordinal
+
+
+    @property
+    def suit(self):
+        """
+            The suit of the card
+
+            return: int
+        """
+        return self._ordinal // 13
+
+
+    @property
+    def rank(self):
+        """
+            The rank of the card
+
+            return: int
+        """
+        return self._ordinal % 13 + 1
 
     
     def __str__(self):
@@ -40,7 +99,25 @@ class Card:
 
             return: string
         """
-        return "%s of %s" % (Card.rank_names[self.rank], Card.suit_names[self.suit])
+        return Card.names[self._ordinal]
+
+
+    def __reduce__(self):
+        """
+            Pickles the card by ordinal so that unpickling returns the interned instance
+
+            return: tuple
+        """
+        return Card.from_ordinal, (self._ordinal,)
+
+
+    def __hash__(self):
+        """
+            Returns the hash of the card, which is its ordinal
+
+            return: int
+        """
+        return self._ordinal
 
     
     def __lt__(self, other):
@@ -52,9 +129,9 @@ class Card:
 
             return: boolean; True if the card is less than the other, False otherwise
         """
-        t1 = self.suit, self.rank
-        t2 = other.suit, other.rank
-        return t1 < t2
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self._ordinal < other._ordinal
 
 
     def __eq__(self, other):
@@ -65,7 +142,9 @@ class Card:
 
             return: boolean; True if the cards are equal, False otherwise
         """
-        return (self.suit == other.suit) and (self.rank == other.rank)
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self._ordinal == other._ordinal
 
 
     def __gt__(self, other):
@@ -77,12 +156,58 @@ class Card:
 
             return: boolean; True if the card is greater than the other, False otherwise
         """
-        t1 = self.suit, self.rank
-        t2 = other.suit, other.rank
-        return t1 > t2
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self._ordinal > other._ordinal
 
-    
-class Deck:
+
+def _make_card(ordinal):
+    """
+        Creates one of the 52 interned cards; only used to build Card.all_cards
+
+        ordinal: int
+
+        return: Card
+    """
+    card = object.__new__(Card)
+    card._ordinal = ordinal
+    return card
+
+
+Card.all_cards = tuple(_make_card(ordinal) for ordinal in range(52))
+Card.names = tuple("%s of %s" % (Card.rank_names[card.rank], Card.suit_names[card.suit]) for card in Card.all_cards)
+
+
+# caches of method resolution, keyed by class; see ClassWatcher
+_defining_classes = {}
+
+
+def clear_class_caches():
+    """
+        Empties the caches of method resolution
+
+        Setting or deleting an attribute of a class made by ClassWatcher does this
+        automatically; other classes are never cached.
+    """
+    _defining_classes.clear()
+
+
+class ClassWatcher(type):
+    """
+        Metaclass that empties the caches of method resolution whenever an
+        attribute of one of its classes is set or deleted, as monkeypatching does
+    """
+    def __setattr__(cls, name, value):
+        type.__setattr__(cls, name, value)
+        clear_class_caches()
+
+
+    def __delattr__(cls, name):
+        type.__delattr__(cls, name)
+        clear_class_caches()
+
+
+class Deck(metaclass=ClassWatcher):
     """
         Represents a deck of cards
 
@@ -106,10 +231,8 @@ class Deck:
 
             return: string 
         """
-        result = []
-        for card in self.cards:
-            result.append(str(card))
-        return "\n".join(result)
+        names = Card.names
+        return "\n".join([names[card.ordinal] for card in self.cards])
 
 
     def pop_card(self, i = 1):
@@ -180,12 +303,25 @@ def find_defining_class(obj, method_name):
         obj: object
         method_name: string
 
-        return: type
+        return: type; cached per class for classes made by ClassWatcher, which clear
+            the cache when they change, and found afresh for any other class
     """
-    for ty in type(obj).mro():
+    cls = type(obj)
+    watched = isinstance(cls, ClassWatcher)
+    if watched:
+        key = (cls, method_name)
+        try:
+            return _defining_classes[key]
+        except KeyError:
+            pass
+    result = None
+    for ty in cls.mro():
         if method_name in ty.__dict__:
-            return ty
-    return None
+            result = ty
+            break
+    if watched:
+        _defining_classes[key] = result
+    return result
 
 
 if __name__ == '__main__':
@@ -8,6 +8,7 @@
     
     Note: Using Python 3.9.0
 """
+import itertools
 import random
 
 
@@ -15,23 +16,82 @@ class Card:
     """
         Represents a playing card
 
+        Cards are flyweights: there are exactly 52 instances, created once when
+        the module is imported, and Card(suit, rank) returns the shared instance.
+        Each card stores a single ordinal, suit * 13 + (rank - 1), so the ordinals
+        run 0-51 in the same order as (suit, rank).
+
         attributes: 
-            suit: integer (0-3)
-            rank: integer (1-13)
+            ordinal: integer (0-51); read-only, since every card is shared
+            suit: integer (0-3); derived from ordinal
+            rank: integer (1-13); derived from ordinal
     """
+    __slots__ = ('_ordinal',)
+
     suit_names = ["Clubs", "Diamonds", "Hearts", "Spades"]
     rank_names = [None, "Ace", "2", "3", "4", "5", "6", "7", "8", "9", "10", "Jack", "Queen", "King"]
 
+    # the 52 interned cards, indexed by ordinal; filled in below the class
+    all_cards = ()
+
+    # the human-readable name of each card, indexed by ordinal; filled in below the class
+    names = ()
 
-    def __init__(self, suit = 0, rank = 0):
+
+    def __new__(cls, suit = 0, rank = 1):
         """
-            Initializes the object when instantiated
+            Returns the interned card for the given suit and rank
 
             suit: int
             rank: int
+
+            return: Card
+        """
+        if not (0 <= suit < 4 and 1 <= rank < 14):
+            raise ValueError("invalid card: suit %r, rank %r" % (suit, rank))
+        return Card.all_cards[suit * 13 + rank - 1]
+
+
+    @classmethod
+    def from_ordinal(cls, ordinal):
+        """
+            Returns the interned card with the given ordinal
+
+            ordinal: int (0-51)
+
+            return: Card
+        """
+        return Card.all_cards[ordinal]
+
+
+    @property
+    def ordinal(self):
+        """
+            The ordinal of the card, suit * 13 + (rank - 1)
+
+            return: int
+        """
+        return self._ordinal
+
+
+    @property
+    def suit(self):
+        """
+            The suit of the card
+
+            return: int
         """
-        self.suit = suit
-        self.rank = rank
+        return self._ordinal // 13
+
+
+    @property
+    def rank(self):
+        """
+            The rank of the card
+
+            return: int
+        """
+        return self._ordinal % 13 + 1
 
     
     def __str__(self):
@@ -40,7 +100,25 @@ class Card:
 
             return: string
         """
-        return "%s of %s" % (Card.rank_names[self.rank], Card.suit_names[self.suit])
+        return Card.names[self._ordinal]
+
+
+    def __reduce__(self):
+        """
+            Pickles the card by ordinal so that unpickling returns the interned instance
+
+            return: tuple
+        """
+        return Card.from_ordinal, (self._ordinal,)
+
+
+    def __hash__(self):
+        """
+            Returns the hash of the card, which is its ordinal
+
+            return: int
+        """
+        return self._ordinal
 
     
     def __lt__(self, other):
@@ -52,9 +130,9 @@ class Card:
 
             return: boolean; True if the card is less than the other, False otherwise
         """
-        t1 = self.suit, self.rank
-        t2 = other.suit, other.rank
-        return t1 < t2
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self._ordinal < other._ordinal
 
 
     def __eq__(self, other):
@@ -65,7 +143,9 @@ class Card:
 
             return: boolean; True if the cards are equal, False otherwise
         """
-        return (self.suit == other.suit) and (self.rank == other.rank)
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self._ordinal == other._ordinal
 
 
     def __gt__(self, other):
@@ -77,9 +157,26 @@ class Card:
 
             return: boolean; True if the card is greater than the other, False otherwise
         """
-        t1 = self.suit, self.rank
-        t2 = other.suit, other.rank
-        return t1 > t2
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self._ordinal > other._ordinal
+
+
+def _make_card(ordinal):
+    """
+        Creates one of the 52 interned cards; only used to build Card.all_cards
+
+        ordinal: int
+
+        return: Card
+    """
+    card = object.__new__(Card)
+    card._ordinal = ordinal
+    return card
+
+
+Card.all_cards = tuple(_make_card(ordinal) for ordinal in range(52))
+Card.names = tuple("%s of %s" % (Card.rank_names[card.rank], Card.suit_names[card.suit]) for card in Card.all_cards)
 
     
 class Deck:
@@ -89,15 +186,24 @@ class Deck:
         attributes:
             cards: list of Card objects
     """
-    def __init__(self):
+    # the default random number generator for shuffle; None means the random module
+    rng = None
+
+    def __init__(self, rng=None):
         """
             Initializes the deck with 52 cards
+
+            rng: random number generator for shuffle; by default, the random module
         """
-        self.cards = []
-        for suit in range(4):
-            for rank in range(1, 14):
-                card = Card(suit, rank)
-                self.cards.append(card)
+        self.cards = list(Card.all_cards)
+        self.rng = rng
+
+
+    def reset(self):
+        """
+            Puts all 52 cards back in the deck, in order, reusing the list of cards
+        """
+        self.cards[:] = Card.all_cards
     
 
     def __str__(self):
@@ -106,10 +212,8 @@ class Deck:
 
             return: string 
         """
-        result = []
-        for card in self.cards:
-            result.append(str(card))
-        return "\n".join(result)
+        names = Card.names
+        return "\n".join([names[card.ordinal] for card in self.cards])
 
 
     def pop_card(self, i = 1):
@@ -132,11 +236,18 @@ class Deck:
         self.cards.append(card)
     
 
-    def shuffle(self):
+    def shuffle(self, rng=None):
         """
             Randomly shuffle the cards in the deck
+
+            rng: any object with a shuffle method, such as random.Random or
+                rngs.CounterRandom; by default, the deck's own rng
         """
-        random.shuffle(self.cards)
+        if rng is None:
+            rng = self.rng
+        if rng is None:
+            rng = random
+        rng.shuffle(self.cards)
 
 
     def move_cards(self, hand, num):
@@ -166,16 +277,49 @@ class Deck:
 
             return: list [Hand]
         """
-        # Initialize the variable
-        hands = []
+        return list(self.iter_hands(number_of_hands, cards_per_hand))
+
+
+    def iter_hands(self, number_of_hands, cards_per_hand):
+        """
+            Deal a number of hands with a number of cards in each hand, one hand at a time
+
+            number_of_hands: int
+            cards_per_hand: int
+
+            return: generator of Hand
+        """
         for hand_count in range(number_of_hands):
             # Instantiate Hand
             hand = Hand("Hand number %d" % (hand_count + 1))
             for card in range(cards_per_hand):
                 # pop cards from the deck into the hand
                 hand.add_card(self.pop_card())
-            hands.append(hand)
-        return hands
+            yield hand
+
+
+    def deal_array(self, number_of_hands, cards_per_hand):
+        """
+            Deal a number of hands as an array of card ordinals, without creating Hand objects
+
+            The cards come off the deck in the same order as deal_hands deals them.
+
+            number_of_hands: int
+            cards_per_hand: int
+
+            return: memoryview of shape (number_of_hands, cards_per_hand), or an empty
+                one-dimensional memoryview if no cards are dealt
+        """
+        num = number_of_hands * cards_per_hand
+        if num > len(self.cards):
+            raise IndexError("cannot deal %d cards from a deck of %d" % (num, len(self.cards)))
+        dealt = self.cards[len(self.cards) - num:]
+        del self.cards[len(self.cards) - num:]
+        data = bytearray(card.ordinal for card in reversed(dealt))
+        if not data:
+            # memoryview cannot make an empty multi-dimensional view
+            return memoryview(data)
+        return memoryview(data).cast('B', (number_of_hands, cards_per_hand))
 
 
 class Hand(Deck):
@@ -194,6 +338,88 @@ class Hand(Deck):
         self.label = label
 
 
+    def reset(self):
+        """
+            Empties the hand so that it can be dealt again
+        """
+        self.cards.clear()
+
+
+def deal_stream(number_of_hands, cards_per_hand, decks=None, rng=None):
+    """
+        Deal hands from a sequence of freshly shuffled decks, one hand at a time
+
+        number_of_hands: int; hands per deck
+        cards_per_hand: int
+        decks: int; number of decks; by default, the stream never ends
+        rng: random number generator for Deck.shuffle; by default, the random module
+
+        return: generator of Hand
+    """
+    deck = Deck(rng)
+    counter = itertools.count() if decks is None else range(decks)
+    for deck_count in counter:
+        deck.reset()
+        deck.shuffle()
+        yield from deck.iter_hands(number_of_hands, cards_per_hand)
+
+
+def deal_arrays(decks, number_of_hands, cards_per_hand, rng=None):
+    """
+        Deal hands from a number of freshly shuffled decks as one array of card ordinals
+
+        No Card or Hand objects are created; use hands_from_array to get Hands back.
+        NumPy can view the result without copying it, with numpy.asarray.
+
+        decks: int
+        number_of_hands: int; hands per deck
+        cards_per_hand: int
+        rng: random.Random, or an rngs.CounterRandom to draw all the decks in bulk;
+            by default, the random module
+
+        return: memoryview of shape (decks, number_of_hands, cards_per_hand), or an
+            empty one-dimensional memoryview if no cards are dealt
+    """
+    num = number_of_hands * cards_per_hand
+    if num > 52:
+        raise ValueError("cannot deal %d cards from one deck" % num)
+    if rng is None:
+        rng = random
+
+    if hasattr(rng, 'permutations'):
+        data = bytearray(rng.permutations(decks)[:, :num].tobytes())
+    else:
+        ordinals = range(52)
+        data = bytearray()
+        for deck_count in range(decks):
+            # the first num cards of a random permutation of the deck
+            data += bytes(rng.sample(ordinals, num))
+    if not data:
+        # memoryview cannot make an empty multi-dimensional view
+        return memoryview(data)
+    return memoryview(data).cast('B', (decks, number_of_hands, cards_per_hand))
+
+
+def hands_from_array(array):
+    """
+        Wrap an array of card ordinals back into Hand objects
+
+        array: memoryview, nested list or numpy array of shape (hands, cards) or (decks, hands, cards)
+
+        return: list [Hand], or a list of them per deck
+    """
+    rows = array.tolist() if hasattr(array, 'tolist') else array
+    if rows and rows[0] and isinstance(rows[0][0], list):
+        return [hands_from_array(deck) for deck in rows]
+
+    hands = []
+    for hand_count, ordinals in enumerate(rows):
+        hand = Hand("Hand number %d" % (hand_count + 1))
+        hand.cards = [Card.from_ordinal(ordinal) for ordinal in ordinals]
+        hands.append(hand)
+    return hands
+
+
 def main():
     """
         Main function
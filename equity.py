@@ -0,0 +1,229 @@
+"""
+    This module computes the equity of poker hands in a spot
+
+    Each player holds some known cards, there may be a partial board of shared
+    cards, and there may be opponents whose cards are unknown.  When the ways of
+    completing the board are few enough, they are all enumerated; otherwise deals
+    are sampled until every player's equity is known to within the requested
+    tolerance at the requested confidence.
+
+    Note: Using Python 3.9.0
+"""
+import itertools
+import math
+import random
+from statistics import NormalDist
+
+import evaluator
+from poker import Card, PokerDeck
+
+
+class Equity:
+    """
+        Represents the equity of each player in a spot
+
+        attributes:
+            wins: list of float; fraction of deals each player wins outright
+            ties: list of float; fraction of deals each player splits the pot
+            equity: list of float; share of the pot each player expects, ties split evenly
+            errors: list of float; half-width of the confidence interval on each equity, 0 if exact;
+                padded with pseudo-deals, so it is never 0 for a sampled equity
+            deals: int; number of deals evaluated
+            exact: boolean; True if every deal was enumerated
+    """
+    def __init__(self, wins, ties, shares, squares, deals, z=0.0, exact=False):
+        """
+            Initializes from the totals over a number of deals
+
+            wins: list of int
+            ties: list of int
+            shares: list of float; sum of the pot share of each player
+            squares: list of float; sum of the squared pot share of each player
+            deals: int
+            z: float; number of standard errors in the confidence interval
+            exact: boolean
+        """
+        self.wins = [win / deals for win in wins]
+        self.ties = [tie / deals for tie in ties]
+        self.equity = [share / deals for share in shares]
+        self.errors = []
+        # like the Agresti-Coull interval, add z * z pseudo-deals, half of them won
+        # and half lost, so that a run of deals with no variance still has an error
+        padded = deals + z * z
+        for share, square in zip(shares, squares):
+            if exact:
+                self.errors.append(0.0)
+            else:
+                mean = (share + z * z / 2) / padded
+                variance = max((square + z * z / 2) / padded - mean * mean, 0.0)
+                self.errors.append(z * math.sqrt(variance / padded))
+        self.deals = deals
+        self.exact = exact
+
+
+    def __str__(self):
+        """
+            Returns a human-readable representation of the equities
+
+            return: string
+        """
+        result = []
+        for i, (equity, error) in enumerate(zip(self.equity, self.errors)):
+            result.append('player %d: equity %.4f +/- %.4f (win %.4f, tie %.4f)'
+                          % (i + 1, equity, error, self.wins[i], self.ties[i]))
+        result.append('%d deals, %s' % (self.deals, 'exact' if self.exact else 'sampled'))
+        return "\n".join(result)
+
+
+def _score(keys, players, wins, ties, shares, squares):
+    """
+        Adds the result of one deal to the totals of the known players
+
+        keys: list of strength keys, known players first
+        players: number of known players
+        wins, ties, shares, squares: lists of totals, updated in place
+    """
+    best = max(keys)
+    winners = keys.count(best)
+    share = 1.0 / winners
+    for i in range(players):
+        if keys[i] == best:
+            if winners == 1:
+                wins[i] += 1
+            else:
+                ties[i] += 1
+            shares[i] += share
+            squares[i] += share * share
+
+
+def pairings(n, k):
+    """
+        Counts the ways to deal k two-card hands from n cards, ignoring the order of the hands
+
+        n: int
+        k: int
+
+        return: int
+    """
+    if 2 * k > n:
+        return 0
+    return math.factorial(n) // (2 ** k * math.factorial(k) * math.factorial(n - 2 * k))
+
+
+def _pairings(cards, k):
+    """
+        Generates every way to deal k two-card hands from cards, ignoring the order of
+        the hands: each hand's lowest card is lower than every card of the hands after it
+
+        cards: list of card ordinals
+        k: int
+
+        return: generator of list of card masks, one per hand
+    """
+    if k == 0:
+        yield []
+        return
+    for i in range(len(cards) - 2 * k + 1):
+        low = 1 << cards[i]
+        rest = cards[i + 1:]
+        for j in range(len(rest)):
+            hand = low | (1 << rest[j])
+            for others in _pairings(rest[:j] + rest[j + 1:], k - 1):
+                yield [hand] + others
+
+
+def equity(hands, board=(), opponents=0, tolerance=0.01, confidence=0.95,
+           exact_limit=100000, max_deals=1000000, batch=1000, rng=None):
+    """
+        Computes the equity of each hand, dealing the board up to five cards
+
+        hands: list of sequences of Card; the known cards of each player
+        board: sequence of Card; the community cards dealt so far
+        opponents: number of additional players, each with two unknown cards
+        tolerance: float; sampling stops when every equity is known to within this
+        confidence: float; the confidence level of the intervals
+        exact_limit: enumerate every deal, boards and opponents' hands together,
+            when there are at most this many
+        max_deals: the most deals to sample
+        batch: number of deals sampled between checks of the confidence intervals
+        rng: random.Random; by default, a new one
+
+        return: Equity
+    """
+    if not hands:
+        raise ValueError("there are no hands to evaluate")
+    masks = [evaluator.hand_mask(hand) for hand in hands]
+    board_mask = evaluator.hand_mask(board)
+    dead = board_mask
+    for mask in masks:
+        dead |= mask
+    if evaluator.card_count(dead) != len(board) + sum(len(hand) for hand in hands):
+        raise ValueError("the same card is dealt twice")
+
+    missing = 5 - len(board)
+    if missing < 0:
+        raise ValueError("the board has more than five cards")
+
+    deck = PokerDeck()
+    remaining = [card.ordinal for card in deck.cards if not (dead >> card.ordinal) & 1]
+    if missing + 2 * opponents > len(remaining):
+        raise ValueError("not enough cards left to deal")
+
+    players = len(hands)
+    wins = [0] * players
+    ties = [0] * players
+    shares = [0.0] * players
+    squares = [0.0] * players
+    strength = evaluator.strength
+
+    if math.comb(len(remaining), missing) * pairings(len(remaining) - missing, opponents) <= exact_limit:
+        deals = 0
+        for cards in itertools.combinations(remaining, missing):
+            full = board_mask
+            for c in cards:
+                full |= 1 << c
+            keys = [strength(mask | full) for mask in masks]
+            rest = [c for c in remaining if not (full >> c) & 1]
+            for others in _pairings(rest, opponents):
+                _score(keys + [strength(full | hand) for hand in others], players, wins, ties, shares, squares)
+                deals += 1
+        return Equity(wins, ties, shares, squares, deals, exact=True)
+
+    if rng is None:
+        rng = random.Random()
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    needed = missing + 2 * opponents
+    deals = 0
+    while deals < max_deals:
+        for i in range(min(batch, max_deals - deals)):
+            cards = rng.sample(remaining, needed)
+            full = board_mask
+            for c in cards[:missing]:
+                full |= 1 << c
+            keys = [strength(mask | full) for mask in masks]
+            for j in range(missing, needed, 2):
+                keys.append(strength(full | (1 << cards[j]) | (1 << cards[j + 1])))
+            _score(keys, players, wins, ties, shares, squares)
+            deals += 1
+
+        result = Equity(wins, ties, shares, squares, deals, z)
+        if max(result.errors) < tolerance:
+            return result
+    return Equity(wins, ties, shares, squares, deals, z)
+
+
+def main():
+    """
+        Prints the equity of a pair of aces against a pair of kings, and of the aces
+        against three unknown hands on a flop
+    """
+    aces = [Card(3, 1), Card(2, 1)]
+    kings = [Card(1, 13), Card(0, 13)]
+    print(equity([aces, kings]))
+
+    flop = [Card(1, 1), Card(1, 7), Card(0, 2)]
+    print(equity([aces], flop, opponents=3))
+
+
+if __name__ == '__main__':
+    main()
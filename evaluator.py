@@ -0,0 +1,271 @@
+"""
+    This module contains a table-driven evaluator for the poker hands in poker.py
+
+    A hand is represented as a 52-bit mask with bit (suit * 13 + rank - 1) set for
+    each card, i.e. bit Card.ordinal.  Slicing the mask gives one 13-bit rank mask
+    per suit, and rank multiplicities (pairs, trips, quads) fall out of bitwise
+    ands of the four suit masks.  Straights, flushes and popcounts are read from
+    lookup tables indexed by a 13-bit rank mask, so evaluating a hand of any size
+    is a fixed handful of integer operations.
+
+    strength packs the category of the best five cards and their tie-break ranks
+    into one integer, so that the better of two hands is the larger integer.
+
+    Note: Using Python 3.9.0
+"""
+
+# categories, weakest to strongest; the value of a category is its index
+CATEGORIES = ('highcard', 'pair', 'twopair', 'threekind', 'straight', 'flush', 'fullhouse', 'fourkind', 'straightflush')
+
+HIGHCARD = 0
+PAIR = 1
+TWOPAIR = 2
+THREEKIND = 3
+STRAIGHT = 4
+FLUSH = 5
+FULLHOUSE = 6
+FOURKIND = 7
+STRAIGHTFLUSH = 8
+
+# the labels in the order PokerHand.all_labels lists them, strongest first
+LABELS = tuple(reversed(CATEGORIES))
+
+RANK_BITS = 0x1FFF
+
+
+def _straight_high(ranks):
+    """
+        Finds the highest straight in a 13-bit rank mask (bit 0 is the ace)
+
+        ranks: int
+
+        return: int; the rank of the top card of the straight (5-14), 0 if there is none
+    """
+    # put rank r at bit r, and the ace at both bit 1 and bit 14
+    ext = (ranks << 1) | ((ranks & 1) << 14)
+    for top in range(14, 4, -1):
+        window = 0x1F << (top - 4)
+        if ext & window == window:
+            return top
+    return 0
+
+
+# POPCOUNT[ranks]: the number of ranks set in a 13-bit mask
+POPCOUNT = tuple(bin(ranks).count('1') for ranks in range(1 << 13))
+
+# STRAIGHT_HIGH[ranks]: the top rank of the best straight in a 13-bit mask, or 0
+STRAIGHT_HIGH = tuple(_straight_high(ranks) for ranks in range(1 << 13))
+
+# STRAIGHT_FLAGS[ranks]: the straight flag for the ranks held in any suit
+STRAIGHT_FLAGS = tuple((1 << STRAIGHT) if high else 0 for high in STRAIGHT_HIGH)
+
+# FLUSH_FLAGS[ranks]: the flush and straight flush flags for the ranks held in one suit
+FLUSH_FLAGS = tuple(
+    ((1 << FLUSH) | ((1 << STRAIGHTFLUSH) if STRAIGHT_HIGH[ranks] else 0)) if POPCOUNT[ranks] >= 5 else 0
+    for ranks in range(1 << 13)
+)
+
+# HIGH_RANK[ranks]: the highest rank in an ace-high rank mask (bit r - 2 is rank r), 0 if empty
+HIGH_RANK = tuple(ranks.bit_length() + 1 if ranks else 0 for ranks in range(1 << 13))
+
+
+def _top_five():
+    """
+        Builds TOP_FIVE, each entry from the entry for the mask without its highest rank
+
+        return: tuple of int
+    """
+    table = [0] * (1 << 13)
+    for ranks in range(1, 1 << 13):
+        high = HIGH_RANK[ranks]
+        table[ranks] = (high << 16) | (table[ranks & ~(1 << (high - 2))] >> 4)
+    return tuple(table)
+
+
+# TOP_FIVE[ranks]: the five highest ranks of an ace-high rank mask, 4 bits each, highest
+# first and padded with zeros; shifting right by 4 * (5 - n) leaves the n highest
+TOP_FIVE = _top_five()
+
+# LABEL_TABLE[flags]: the labels set in flags, strongest first
+LABEL_TABLE = tuple(
+    tuple(CATEGORIES[category] for category in range(STRAIGHTFLUSH, -1, -1) if flags >> category & 1)
+    for flags in range(1 << len(CATEGORIES))
+)
+
+# CATEGORY_TABLE[flags]: the strongest category set in flags, -1 if there is none
+CATEGORY_TABLE = tuple(flags.bit_length() - 1 for flags in range(1 << len(CATEGORIES)))
+
+# BEST_LABEL[flags]: the label of the strongest category in flags, None for no flags
+BEST_LABEL = tuple(CATEGORIES[category] if category >= 0 else None for category in CATEGORY_TABLE)
+
+
+def hand_mask(cards):
+    """
+        Computes the card mask of a collection of cards
+
+        cards: iterable of Card
+
+        return: int
+    """
+    mask = 0
+    for card in cards:
+        mask |= 1 << card.ordinal
+    return mask
+
+
+def card_count(mask):
+    """
+        Counts the cards in a card mask
+
+        mask: int
+
+        return: int
+    """
+    return (POPCOUNT[mask & RANK_BITS] + POPCOUNT[(mask >> 13) & RANK_BITS]
+            + POPCOUNT[(mask >> 26) & RANK_BITS] + POPCOUNT[mask >> 39])
+
+
+def evaluate(mask):
+    """
+        Evaluates a card mask
+
+        mask: int
+
+        return: int; bit c is set for each category c the hand contains; for hands of
+            five or more distinct cards this agrees with the has_* predicates of PokerHand
+    """
+    c = mask & RANK_BITS
+    d = (mask >> 13) & RANK_BITS
+    h = (mask >> 26) & RANK_BITS
+    s = mask >> 39
+
+    flags = (STRAIGHT_FLAGS[c | d | h | s]
+             | FLUSH_FLAGS[c] | FLUSH_FLAGS[d] | FLUSH_FLAGS[h] | FLUSH_FLAGS[s])
+    if not mask:
+        return flags
+
+    # ranks held in at least two suits
+    pairs = (c & d) | (c & h) | (c & s) | (d & h) | (d & s) | (h & s)
+    if not pairs:
+        return flags | (1 << HIGHCARD)
+
+    flags |= (1 << HIGHCARD) | (1 << PAIR)
+    two = POPCOUNT[pairs] >= 2
+    if two:
+        flags |= 1 << TWOPAIR
+    # ranks held in at least three suits
+    if (c & d & (h | s)) | ((c | d) & h & s):
+        flags |= 1 << THREEKIND
+        if two:
+            flags |= 1 << FULLHOUSE
+        if c & d & h & s:
+            flags |= 1 << FOURKIND
+    return flags
+
+
+def category(flags):
+    """
+        Finds the strongest category in the flags returned by evaluate
+
+        flags: int
+
+        return: int; one of the category constants, -1 for an empty hand
+    """
+    return CATEGORY_TABLE[flags]
+
+
+def labels(flags):
+    """
+        Lists the labels in the flags returned by evaluate, in PokerHand.all_labels order
+
+        flags: int
+
+        return: list of string
+    """
+    return list(LABEL_TABLE[flags])
+
+
+def ace_high(ranks):
+    """
+        Converts a rank mask with the ace at bit 0 to one with the ace above the king
+
+        ranks: int
+
+        return: int; bit r - 2 is set for each rank r, with the ace as rank 14
+    """
+    return (ranks >> 1) | ((ranks & 1) << 12)
+
+
+def strength(mask):
+    """
+        Computes the strength key of the best five cards in a card mask
+
+        The key is category << 20 followed by up to five tie-break ranks, 4 bits each,
+        with the ace as 14 (or 1 at the bottom of a straight).  Of two hands, the one
+        with the larger key wins, and equal keys split the pot.
+
+        mask: int
+
+        return: int
+    """
+    c = mask & RANK_BITS
+    d = (mask >> 13) & RANK_BITS
+    h = (mask >> 26) & RANK_BITS
+    s = mask >> 39
+
+    # a flush, if any, is in the one suit holding five of the cards
+    for suit in (c, d, h, s):
+        if POPCOUNT[suit] >= 5:
+            high = STRAIGHT_HIGH[suit]
+            if high:
+                return (STRAIGHTFLUSH << 20) | (high << 16)
+            flush = (FLUSH << 20) | TOP_FIVE[ace_high(suit)]
+            break
+    else:
+        flush = 0
+
+    every = ace_high(c | d | h | s)
+    quads = ace_high(c & d & h & s)
+    if quads:
+        four = HIGH_RANK[quads]
+        return (FOURKIND << 20) | (four << 16) | ((TOP_FIVE[every & ~(1 << (four - 2))] >> 16) << 12)
+
+    trips = ace_high((c & d & (h | s)) | ((c | d) & h & s))
+    pairs = ace_high((c & d) | (c & h) | (c & s) | (d & h) | (d & s) | (h & s))
+    if trips:
+        three = HIGH_RANK[trips]
+        two = HIGH_RANK[pairs & ~(1 << (three - 2))]
+        if two:
+            return (FULLHOUSE << 20) | (three << 16) | (two << 12)
+    if flush:
+        return flush
+
+    high = STRAIGHT_HIGH[c | d | h | s]
+    if high:
+        return (STRAIGHT << 20) | (high << 16)
+
+    if trips:
+        return (THREEKIND << 20) | (three << 16) | ((TOP_FIVE[every & ~(1 << (three - 2))] >> 12) << 8)
+
+    if pairs:
+        first = HIGH_RANK[pairs]
+        rest = pairs & ~(1 << (first - 2))
+        if rest:
+            second = HIGH_RANK[rest]
+            kickers = every & ~(1 << (first - 2)) & ~(1 << (second - 2))
+            return (TWOPAIR << 20) | (first << 16) | (second << 12) | ((TOP_FIVE[kickers] >> 16) << 8)
+        return (PAIR << 20) | (first << 16) | ((TOP_FIVE[every & ~(1 << (first - 2))] >> 8) << 4)
+
+    return (HIGHCARD << 20) | TOP_FIVE[every]
+
+
+def winners(keys):
+    """
+        Finds the winners of a showdown
+
+        keys: sequence of strength keys
+
+        return: list of int; the indices of the largest keys
+    """
+    best = max(keys)
+    return [i for i, key in enumerate(keys) if key == best]
@@ -0,0 +1,168 @@
+"""
+    This module computes exact hand-category frequencies by enumeration
+
+    Every k-card combination of the 52 cards has a combinatorial rank, its index
+    in colexicographic order.  The ranks are split into chunks, each chunk is
+    unranked to its first combination and walked in order by a process pool, and
+    the evaluator flags of every hand are tallied.  For 5 and 7 cards this gives
+    the exact counts of the labels poker.main estimates by sampling.
+
+    Note: Using Python 3.9.0
+"""
+import os
+import time
+from math import comb
+from multiprocessing import Pool
+
+import evaluator
+import poker
+
+
+def rank(combo):
+    """
+        Computes the colexicographic rank of a combination
+
+        combo: sorted sequence of distinct card ordinals
+
+        return: int
+    """
+    return sum(comb(c, i + 1) for i, c in enumerate(combo))
+
+
+def unrank(r, k):
+    """
+        Finds the combination with a given colexicographic rank
+
+        r: int; 0 <= r < comb(52, k)
+        k: number of cards
+
+        return: list of int; sorted card ordinals
+    """
+    combo = [0] * k
+    c = 52
+    for i in range(k, 0, -1):
+        # the largest c such that comb(c, i) <= r
+        c -= 1
+        while comb(c, i) > r:
+            c -= 1
+        combo[i - 1] = c
+        r -= comb(c, i)
+    return combo
+
+
+def count_chunk(args):
+    """
+        Tallies the evaluator flags of a run of consecutive combinations
+
+        args: tuple (k, start, count); cards per hand, rank of the first
+            combination and number of combinations
+
+        return: list of int; the number of hands with each value of the flags
+    """
+    k, start, count = args
+    evaluate = evaluator.evaluate
+    bits = [1 << c for c in range(52)]
+    tally = [0] * len(evaluator.LABEL_TABLE)
+
+    combo = unrank(start, k)
+    while True:
+        # the lowest card varies fastest, so walk it up to the next card
+        rest = 0
+        for c in combo[1:]:
+            rest |= bits[c]
+        first = combo[0]
+        steps = min(combo[1] - first, count)
+        for c in range(first, first + steps):
+            tally[evaluate(rest | bits[c])] += 1
+
+        count -= steps
+        if not count:
+            return tally
+
+        # step to the next combination: increment the lowest card that can be
+        # incremented and reset the ones below it
+        i = 1
+        while i < k - 1 and combo[i] + 1 == combo[i + 1]:
+            i += 1
+        combo[i] += 1
+        for j in range(i):
+            combo[j] = j
+
+
+def merge_tallies(tallies):
+    """
+        Adds up tallies returned by count_chunk
+
+        tallies: iterable of list of int
+
+        return: list of int
+    """
+    total = [0] * len(evaluator.LABEL_TABLE)
+    for tally in tallies:
+        for flags, freq in enumerate(tally):
+            total[flags] += freq
+    return total
+
+
+def label_hist(tally):
+    """
+        Converts a tally of evaluator flags into a label histogram
+
+        tally: list of int
+
+        return: Hist; map from label to number of hands
+    """
+    return poker.count_flags(tally, poker.Hist())
+
+
+def chunks(k, num_chunks):
+    """
+        Splits the combinations of k cards into runs of consecutive ranks
+
+        k: cards per hand
+        num_chunks: int
+
+        return: list of tuple (k, start, count)
+    """
+    return [(k, start, stop - start) for start, stop in poker.spans(comb(52, k), num_chunks)]
+
+
+def exact_counts(k, workers=None, num_chunks=None):
+    """
+        Counts every k-card hand with each label
+
+        k: cards per hand; at least 5
+        workers: number of processes; by default, the number of CPUs
+        num_chunks: number of pieces of work; by default, 16 per worker
+
+        return: Hist; map from label to number of hands
+    """
+    if k < 5:
+        raise ValueError("exact counts need at least 5 cards per hand")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if num_chunks is None:
+        num_chunks = 16 * workers
+
+    with Pool(workers) as pool:
+        tallies = pool.imap_unordered(count_chunk, chunks(k, num_chunks))
+        return label_hist(merge_tallies(tallies))
+
+
+def main():
+    """
+        Prints the exact label frequencies of 5-card and 7-card hands
+    """
+    for k in (5, 7):
+        start = time.perf_counter()
+        lhist = exact_counts(k)
+        elapsed = time.perf_counter() - start
+
+        print('%d-card hands, %.1f seconds' % (k, elapsed))
+        for label in poker.PokerHand.all_labels:
+            print('%s %d' % (label, lhist.get(label, 0)))
+        poker.print_report(lhist, comb(52, k))
+
+
+if __name__ == '__main__':
+    main()
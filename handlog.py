@@ -0,0 +1,277 @@
+"""
+    This module contains a compact binary format for logs of dealt hands
+
+    A log starts with an 8-byte header: the magic bytes b'PKHL', a version, the
+    record kind and the number of cards per hand.  The records follow:
+
+        CARDS: one byte per card, the card ordinal, in the order the cards were dealt
+        MASK: one little-endian 64-bit integer per hand, with bit card.ordinal set
+            for each card; the order of the cards is not kept
+
+    HandLog memory-maps a log and exposes its records as a memoryview of shape
+    (hands, cards_per_hand) or (hands,), without copying or parsing them.
+
+    Note: Using Python 3.9.0
+"""
+import mmap
+import struct
+import sys
+
+import evaluator
+from poker import Card, PokerHand
+
+
+MAGIC = b'PKHL'
+VERSION = 1
+HEADER = struct.Struct('<4sBBBx')
+
+# record kinds
+CARDS = 1
+MASK = 2
+
+
+class HandLogWriter:
+    """
+        Writes hands to a binary hand log
+
+        attributes:
+            path: string
+            kind: CARDS or MASK
+            cards_per_hand: int
+            count: number of hands written
+    """
+    def __init__(self, path, cards_per_hand, kind=CARDS, buffer_size=1 << 16):
+        """
+            Creates the log, overwriting any file at path
+
+            path: string
+            cards_per_hand: int
+            kind: CARDS or MASK
+            buffer_size: number of bytes to collect before each write
+        """
+        if kind not in (CARDS, MASK):
+            raise ValueError("unknown record kind %r" % (kind,))
+        if not 0 < cards_per_hand <= 52:
+            raise ValueError("invalid number of cards per hand %r" % (cards_per_hand,))
+        self.path = path
+        self.kind = kind
+        self.cards_per_hand = cards_per_hand
+        self.count = 0
+        self.buffer = bytearray()
+        self.buffer_size = buffer_size
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, kind, cards_per_hand))
+
+
+    def write(self, hand):
+        """
+            Appends a hand to the log
+
+            hand: Hand, PokerHand or sequence of Card
+        """
+        cards = getattr(hand, 'cards', hand)
+        if len(cards) != self.cards_per_hand:
+            raise ValueError("expected %d cards, got %d" % (self.cards_per_hand, len(cards)))
+        if self.kind == CARDS:
+            self.buffer += bytes(card.ordinal for card in cards)
+        else:
+            self.buffer += evaluator.hand_mask(cards).to_bytes(8, 'little')
+        self.count += 1
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+
+    def write_hands(self, hands):
+        """
+            Appends hands to the log
+
+            hands: iterable of Hand, PokerHand or sequence of Card
+        """
+        for hand in hands:
+            self.write(hand)
+
+
+    def flush(self):
+        """
+            Writes the buffered records to the file
+        """
+        self.file.write(self.buffer)
+        self.buffer.clear()
+
+
+    def close(self):
+        """
+            Writes the buffered records and closes the file
+        """
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+
+    def __enter__(self):
+        """
+            return: this object, to be closed at the end of a with block
+        """
+        return self
+
+
+    def __exit__(self, *exc_info):
+        """
+            Closes at the end of a with block
+        """
+        self.close()
+
+
+class HandLog:
+    """
+        Reads a binary hand log through a read-only memory map
+
+        attributes:
+            path: string
+            kind: CARDS or MASK
+            cards_per_hand: int
+            records: memoryview of shape (hands, cards_per_hand) of card ordinals for
+                CARDS, or of shape (hands,) of card masks for MASK; memoryview cannot
+                index one row of a two-dimensional view, so read CARDS records with
+                records[i, j], or a whole hand with ordinals(i)
+            flat: memoryview of the record bytes, one dimensional
+            record_size: number of bytes per record
+    """
+    def __init__(self, path):
+        """
+            Opens and maps the log
+
+            path: string
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.kind, self.cards_per_hand = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            self.map.close()
+            raise ValueError("%s is not a version %d hand log" % (path, VERSION))
+        if self.kind not in (CARDS, MASK) or not 0 < self.cards_per_hand <= 52:
+            self.map.close()
+            raise ValueError("%s has an unknown record kind %r or %r cards per hand"
+                             % (path, self.kind, self.cards_per_hand))
+        self._map_records()
+
+
+    def _map_records(self):
+        """
+            Makes the records and flat views of the mapped log
+        """
+        body = memoryview(self.map)[HEADER.size:]
+        size = 8 if self.kind == MASK else self.cards_per_hand
+        body = body[:len(body) - len(body) % size]
+        self.flat = body
+        self.record_size = size
+        if not body:
+            # memoryview cannot make an empty two-dimensional view
+            self.records = body.cast('B')
+        elif self.kind == CARDS:
+            self.records = body.cast('B', (len(body) // size, size))
+        elif sys.byteorder == 'little':
+            self.records = body.cast('Q')
+        else:
+            # the masks are stored little-endian, so a big-endian host needs a copy
+            swapped = b''.join(bytes(body[i:i + 8])[::-1] for i in range(0, len(body), 8))
+            self.records = memoryview(swapped).cast('Q')
+
+
+    def __len__(self):
+        """
+            return: int; the number of hands in the log
+        """
+        return len(self.flat) // self.record_size
+
+
+    def ordinals(self, i):
+        """
+            Returns the card ordinals of a hand
+
+            i: int; index of the hand
+
+            return: list of int
+        """
+        if self.kind == CARDS:
+            n = self.cards_per_hand
+            return list(self.flat[i * n:(i + 1) * n])
+        mask = self.records[i]
+        return [ordinal for ordinal in range(52) if (mask >> ordinal) & 1]
+
+
+    def mask(self, i):
+        """
+            Returns the card mask of a hand
+
+            i: int; index of the hand
+
+            return: int
+        """
+        if self.kind == MASK:
+            return self.records[i]
+        mask = 0
+        for ordinal in self.ordinals(i):
+            mask |= 1 << ordinal
+        return mask
+
+
+    def hand(self, i):
+        """
+            Builds a PokerHand from a record
+
+            i: int; index of the hand
+
+            return: PokerHand
+        """
+        hand = PokerHand()
+        for ordinal in self.ordinals(i):
+            hand.add_card(Card.from_ordinal(ordinal))
+        return hand
+
+
+    def hands(self):
+        """
+            Builds a PokerHand from each record in turn
+
+            return: generator of PokerHand
+        """
+        for i in range(len(self)):
+            yield self.hand(i)
+
+
+    def close(self):
+        """
+            Releases the records and unmaps the log; closing twice does nothing
+
+            Raises BufferError, leaving the log open, while the caller still holds a
+            buffer taken from records, such as numpy.asarray(log.records); release
+            it and close again.
+        """
+        if self.map.closed:
+            return
+        self.records.release()
+        self.flat.release()
+        try:
+            self.map.close()
+        except BufferError:
+            # put the views back, so that the log stays usable and can be closed again
+            self._map_records()
+            raise BufferError("%s is still in use: release the views taken from its records first"
+                              % self.path) from None
+
+
+    def __enter__(self):
+        """
+            return: this object, to be closed at the end of a with block
+        """
+        return self
+
+
+    def __exit__(self, *exc_info):
+        """
+            Closes at the end of a with block
+        """
+        self.close()
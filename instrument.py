@@ -0,0 +1,207 @@
+"""
+    This module contains opt-in per-stage instrumentation for the simulation in poker.main
+
+    Enabling instrumentation wraps the methods behind each stage (building and
+    resetting decks, shuffling, dealing, the histograms, classification and each
+    has_* check) so that every call is counted and timed.  Disabling it puts the
+    original methods back, so there is no overhead at all when it is off.  Times
+    are inclusive: a stage's time includes the stages it calls.  A generator
+    stage, such as iter_hands, is timed across all of its iterations.
+
+    Normally classify passes hands of five or more cards to the evaluator, so the
+    evaluator.evaluate row stands in for the has_* checks and they show no calls;
+    enable(predicates=True) makes classify run the has_* checks instead.
+
+        with instrument.instrumented() as recorder:
+            poker.main()
+        print(recorder.report())
+
+    Note: Using Python 3.9.0
+"""
+import functools
+import inspect
+import json
+import time
+from contextlib import contextmanager
+
+import evaluator
+import poker
+
+
+# the instrumented stages, as (owner, attribute, stage name)
+STAGES = [
+    (poker.Deck, '__init__', 'deck.construct'),
+    (poker.Deck, 'reset', 'deck.reset'),
+    (poker.Deck, 'shuffle', 'deck.shuffle'),
+    (poker.Deck, 'move_cards', 'deck.move_cards'),
+    (poker.PokerDeck, 'deal_into', 'pokerdeck.deal_into'),
+    (poker.PokerDeck, 'iter_hands', 'pokerdeck.iter_hands'),
+    (poker.PokerHand, 'make_histograms', 'pokerhand.make_histograms'),
+    (poker.PokerHand, 'make_sets', 'pokerhand.make_sets'),
+    (poker.PokerHand, 'classify', 'pokerhand.classify'),
+    (evaluator, 'evaluate', 'evaluator.evaluate'),
+] + [(poker.PokerHand, 'has_' + label, 'pokerhand.has_' + label) for label in poker.PokerHand.all_labels]
+
+
+class Recorder:
+    """
+        Records the number of calls and the cumulative time of each stage
+
+        attributes:
+            calls: map from stage name to number of calls
+            seconds: map from stage name to total seconds spent in the stage
+    """
+    def __init__(self):
+        """
+            Initializes an empty recorder
+        """
+        self.calls = {}
+        self.seconds = {}
+
+
+    def wrap(self, name, func):
+        """
+            Wraps a function so that its calls are recorded under a stage name
+
+            name: string
+            func: function
+
+            return: function
+        """
+        calls = self.calls
+        seconds = self.seconds
+        clock = time.perf_counter
+
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                # time the body of the generator, not the consumer between items
+                elapsed = 0.0
+                iterator = func(*args, **kwargs)
+                try:
+                    while True:
+                        start = clock()
+                        try:
+                            item = next(iterator)
+                        except StopIteration:
+                            return
+                        finally:
+                            elapsed += clock() - start
+                        yield item
+                finally:
+                    iterator.close()
+                    calls[name] = calls.get(name, 0) + 1
+                    seconds[name] = seconds.get(name, 0.0) + elapsed
+            return generator_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                calls[name] = calls.get(name, 0) + 1
+                seconds[name] = seconds.get(name, 0.0) + clock() - start
+        return wrapper
+
+
+    def to_dict(self):
+        """
+            Collects the recorded stages
+
+            return: dict; map from stage name to a dict of calls, seconds and microseconds per call
+        """
+        result = {}
+        for name, calls in self.calls.items():
+            seconds = self.seconds[name]
+            result[name] = {'calls': calls, 'seconds': seconds, 'us_per_call': seconds / calls * 1e6}
+        return result
+
+
+    def to_json(self):
+        """
+            Returns the recorded stages as JSON
+
+            return: string
+        """
+        return json.dumps(self.to_dict(), indent=2, sort_keys=True)
+
+
+    def report(self):
+        """
+            Returns a table of the recorded stages, slowest first
+
+            return: string
+        """
+        rows = sorted(self.to_dict().items(), key=lambda item: item[1]['seconds'], reverse=True)
+        result = ['%-28s %10s %10s %12s' % ('stage', 'calls', 'seconds', 'us/call')]
+        for name, row in rows:
+            result.append('%-28s %10d %10.3f %12.3f' % (name, row['calls'], row['seconds'], row['us_per_call']))
+        return "\n".join(result)
+
+
+# the originals of the wrapped attributes, while instrumentation is enabled
+_originals = []
+
+
+def enable(recorder=None, predicates=False):
+    """
+        Starts recording every stage
+
+        recorder: Recorder; by default, a new one
+        predicates: boolean; whether classify should run the has_* checks
+            instead of the evaluator, so that they are recorded
+
+        return: Recorder
+    """
+    if _originals:
+        raise RuntimeError("instrumentation is already enabled")
+    if recorder is None:
+        recorder = Recorder()
+    if predicates:
+        _originals.append((poker.PokerHand, 'evaluator_enabled', vars(poker.PokerHand)['evaluator_enabled']))
+        poker.PokerHand.evaluator_enabled = False
+    for owner, attr, name in STAGES:
+        original = vars(owner)[attr]
+        _originals.append((owner, attr, original))
+        setattr(owner, attr, recorder.wrap(name, original))
+    return recorder
+
+
+def disable():
+    """
+        Stops recording and restores the original methods
+    """
+    while _originals:
+        owner, attr, original = _originals.pop()
+        setattr(owner, attr, original)
+
+
+@contextmanager
+def instrumented(recorder=None, predicates=False):
+    """
+        Records every stage for the duration of a with block
+
+        recorder: Recorder; by default, a new one
+        predicates: boolean; whether classify should run the has_* checks, see enable
+
+        return: context manager that yields the Recorder
+    """
+    recorder = enable(recorder, predicates)
+    try:
+        yield recorder
+    finally:
+        disable()
+
+
+def main():
+    """
+        Runs poker.main with instrumentation and prints the report
+    """
+    with instrumented() as recorder:
+        poker.main()
+    print(recorder.report())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+    This module contains a multi-process runner for the simulation in poker.main
+
+    The decks are split over a process pool.  Each worker gets its own random
+    number generator, seeded from the run seed and the worker index, so a run is
+    reproducible from its seed and worker count, and the per-worker label
+    histograms are merged into one.
+
+    Note: Using Python 3.9.0
+"""
+import hashlib
+import os
+import random
+import time
+from multiprocessing import Pool
+
+import poker
+
+
+def worker_seeds(seed, workers):
+    """
+        Derives an independent seed for each worker from the run seed
+
+        seed: int
+        workers: int
+
+        return: list of int
+    """
+    seeds = []
+    for index in range(workers):
+        digest = hashlib.sha256(("%d:%d" % (seed, index)).encode()).digest()
+        seeds.append(int.from_bytes(digest[:16], 'big'))
+    return seeds
+
+
+def run_chunk(args):
+    """
+        Runs one worker's share of the simulation
+
+        args: tuple (n, num_cards, num_hands, seed, use_batch, use_counter)
+
+        return: map from label to number of occurrences
+    """
+    n, num_cards, num_hands, seed, use_batch, use_counter = args
+    if use_batch:
+        # the batch engine needs NumPy, so only import it when asked for
+        import batch
+        return batch.simulate(n, num_cards, num_hands, seed=seed)
+    if use_counter:
+        import rngs
+        return poker.simulate(n, num_cards, num_hands, rng=rngs.CounterRandom(seed))
+    return poker.simulate(n, num_cards, num_hands, rng=random.Random(seed))
+
+
+def merge(hists):
+    """
+        Merges label histograms
+
+        hists: iterable of Hist or ArrayHist
+
+        return: ArrayHist
+    """
+    total = poker.ArrayHist(poker.PokerHand.all_labels)
+    for hist in hists:
+        total.update(hist)
+    return total
+
+
+def run(n, num_cards=7, num_hands=7, workers=None, seed=None, use_batch=False, use_counter=False):
+    """
+        Deals num_hands hands of num_cards cards from each of n decks over a process pool
+
+        n: number of decks
+        num_cards: cards per hand
+        num_hands: hands per deck
+        workers: number of processes; by default, the number of CPUs
+        seed: int; by default, a random one
+        use_batch: boolean; whether workers use the NumPy batch engine
+        use_counter: boolean; whether workers shuffle with rngs.CounterRandom
+
+        return: tuple (ArrayHist, seed); the merged label histogram and the seed used
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if seed is None:
+        seed = int.from_bytes(os.urandom(8), 'big')
+
+    tasks = [(count, num_cards, num_hands, worker_seed, use_batch, use_counter)
+             for count, worker_seed in zip(poker.split(n, workers), worker_seeds(seed, workers))]
+    with Pool(workers) as pool:
+        hists = pool.map(run_chunk, tasks)
+    return merge(hists), seed
+
+
+def main():
+    """
+        Runs the simulation in poker.main on every CPU
+    """
+    n = 100000
+    start = time.perf_counter()
+    lhist, seed = run(n, 7, 7)
+    elapsed = time.perf_counter() - start
+
+    print('seed', seed)
+    poker.print_report(lhist, 7.0 * n)
+    print('%.0f hands per second' % (7.0 * n / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+    This module contains the compact text notation for cards and hands
+
+    A card is written as its rank and suit, "Ah Kd 7c Ts", with T for 10 and the
+    suits c, d, h and s.  A hand is its cards separated by spaces, and many hands
+    are one hand per line.  Every code is precomputed, so formatting and parsing
+    are table lookups; parsing also accepts lower-case ranks and "10" for T.
+
+    Note: Using Python 3.9.0
+"""
+from poker import Card, PokerHand
+
+
+RANK_CHARS = 'A23456789TJQK'
+SUIT_CHARS = 'cdhs'
+
+# CODES[ordinal]: the code of each card
+CODES = tuple(RANK_CHARS[ordinal % 13] + SUIT_CHARS[ordinal // 13] for ordinal in range(52))
+
+# ORDINALS[code]: the ordinal of each card, for every accepted spelling of its code
+ORDINALS = {}
+for _ordinal, _code in enumerate(CODES):
+    ORDINALS[_code] = _ordinal
+    ORDINALS[_code[0].lower() + _code[1]] = _ordinal
+    if _code[0] == 'T':
+        ORDINALS['10' + _code[1]] = _ordinal
+del _ordinal, _code
+
+
+def parse_ordinal(code):
+    """
+        Parses one card code
+
+        code: string, such as "Ah"
+
+        return: int; the card ordinal
+    """
+    try:
+        return ORDINALS[code]
+    except KeyError:
+        raise ValueError("invalid card %r" % (code,)) from None
+
+
+def parse_ordinals(text):
+    """
+        Parses the cards of one hand
+
+        text: string, such as "Ah Kd 7c"
+
+        return: list of int; the card ordinals
+    """
+    try:
+        return [ORDINALS[code] for code in text.split()]
+    except KeyError as e:
+        raise ValueError("invalid card %r" % (e.args[0],)) from None
+
+
+def parse_cards(text, card_class=Card):
+    """
+        Parses the cards of one hand
+
+        text: string, such as "Ah Kd 7c"
+        card_class: the Card class to return, from card, deal_hands or poker
+
+        return: list of Card
+    """
+    cards = card_class.all_cards
+    return [cards[ordinal] for ordinal in parse_ordinals(text)]
+
+
+def parse_hand(text, hand_class=PokerHand, card_class=Card):
+    """
+        Parses a hand
+
+        text: string, such as "Ah Kd 7c"
+        hand_class: the class of hand to return
+        card_class: the Card class that goes with hand_class
+
+        return: Hand
+    """
+    hand = hand_class()
+    for card in parse_cards(text, card_class):
+        hand.add_card(card)
+    return hand
+
+
+def format_ordinals(ordinals):
+    """
+        Formats the cards of one hand
+
+        ordinals: iterable of card ordinals
+
+        return: string, such as "Ah Kd 7c"
+    """
+    return " ".join([CODES[ordinal] for ordinal in ordinals])
+
+
+def format_cards(cards):
+    """
+        Formats the cards of one hand
+
+        cards: Deck, Hand or iterable of Card
+
+        return: string, such as "Ah Kd 7c"
+    """
+    cards = getattr(cards, 'cards', cards)
+    return " ".join([CODES[card.ordinal] for card in cards])
+
+
+def format_mask(mask):
+    """
+        Formats the cards in an evaluator card mask, in ordinal order
+
+        mask: int
+
+        return: string
+    """
+    return " ".join([CODES[ordinal] for ordinal in range(52) if (mask >> ordinal) & 1])
+
+
+def encode_hands(hands):
+    """
+        Formats many hands, one per line
+
+        hands: iterable of Hand, iterable of Card, or iterable of card ordinals
+            (such as the rows of deal_hands.deal_arrays or handlog records)
+
+        return: string
+    """
+    lines = []
+    for hand in hands:
+        cards = list(getattr(hand, 'cards', hand))
+        if cards and hasattr(cards[0], 'ordinal'):
+            cards = [card.ordinal for card in cards]
+        lines.append(" ".join([CODES[ordinal] for ordinal in cards]))
+    return "\n".join(lines)
+
+
+def decode_hands(text):
+    """
+        Parses many hands, one per line; blank lines are skipped
+
+        text: string
+
+        return: list of list of int; the card ordinals of each hand
+    """
+    return [parse_ordinals(line) for line in text.splitlines() if line.strip()]
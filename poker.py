@@ -8,30 +8,97 @@
     
     Note: Using Python 3.9.0
 """
+import argparse
+import itertools
+import math
 import random
+import time
+from statistics import NormalDist
+
+import evaluator
+import ranktable
 
 
 class Card:
     """
         Represents a playing card
 
+        Cards are flyweights: there are exactly 52 instances, created once when
+        the module is imported, and Card(suit, rank) returns the shared instance.
+        Each card stores a single ordinal, suit * 13 + (rank - 1), so the ordinals
+        run 0-51 in the same order as (suit, rank).
+
         attributes: 
-            suit: integer (0-3)
-            rank: integer (1-13)
+            ordinal: integer (0-51); read-only, since every card is shared
+            suit: integer (0-3); derived from ordinal
+            rank: integer (1-13); derived from ordinal
     """
+    __slots__ = ('_ordinal',)
+
     suit_names = ["Clubs", "Diamonds", "Hearts", "Spades"]
     rank_names = [None, "Ace", "2", "3", "4", "5", "6", "7", "8", "9", "10", "Jack", "Queen", "King"]
 
+    # the 52 interned cards, indexed by ordinal; filled in below the class
+    all_cards = ()
+
+    # the human-readable name of each card, indexed by ordinal; filled in below the class
+    names = ()
+
 
-    def __init__(self, suit = 0, rank = 0):
+    def __new__(cls, suit = 0, rank = 1):
         """
-            Initializes the object when instantiated
+            Returns the interned card for the given suit and rank
 
             suit: int
             rank: int
+
+            return: Card
+        """
+        if not (0 <= suit < 4 and 1 <= rank < 14):
+            raise ValueError("invalid card: suit %r, rank %r" % (suit, rank))
+        return Card.all_cards[suit * 13 + rank - 1]
+
+
+    @classmethod
+    def from_ordinal(cls, ordinal):
+        """
+            Returns the interned card with the given ordinal
+
+            ordinal: int (0-51)
+
+            return: Card
+        """
+        return Card.all_cards[ordinal]
+
+
+    @property
+    def ordinal(self):
+        """
+            The ordinal of the card, suit * 13 + (rank - 1)
+
+            return: int
         """
-        self.suit = suit
-        self.rank = rank
+        return self._ordinal
+
+
+    @property
+    def suit(self):
+        """
+            The suit of the card
+
+            return: int
+        """
+        return self._ordinal // 13
+
+
+    @property
+    def rank(self):
+        """
+            The rank of the card
+
+            return: int
+        """
+        return self._ordinal % 13 + 1
 
     
     def __str__(self):
@@ -40,7 +107,25 @@ class Card:
 
             return: string
         """
-        return "%s of %s" % (Card.rank_names[self.rank], Card.suit_names[self.suit])
+        return Card.names[self._ordinal]
+
+
+    def __reduce__(self):
+        """
+            Pickles the card by ordinal so that unpickling returns the interned instance
+
+            return: tuple
+        """
+        return Card.from_ordinal, (self._ordinal,)
+
+
+    def __hash__(self):
+        """
+            Returns the hash of the card, which is its ordinal
+
+            return: int
+        """
+        return self._ordinal
 
     
     def __lt__(self, other):
@@ -52,9 +137,9 @@ class Card:
 
             return: boolean; True if the card is less than the other, False otherwise
         """
-        t1 = self.suit, self.rank
-        t2 = other.suit, other.rank
-        return t1 < t2
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self._ordinal < other._ordinal
 
 
     def __eq__(self, other):
@@ -65,7 +150,9 @@ class Card:
 
             return: boolean; True if the cards are equal, False otherwise
         """
-        return (self.suit == other.suit) and (self.rank == other.rank)
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self._ordinal == other._ordinal
 
 
     def __gt__(self, other):
@@ -77,27 +164,83 @@ class Card:
 
             return: boolean; True if the card is greater than the other, False otherwise
         """
-        t1 = self.suit, self.rank
-        t2 = other.suit, other.rank
-        return t1 > t2
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self._ordinal > other._ordinal
 
-    
-class Deck:
+
+def _make_card(ordinal):
+    """
+        Creates one of the 52 interned cards; only used to build Card.all_cards
+
+        ordinal: int
+
+        return: Card
+    """
+    card = object.__new__(Card)
+    card._ordinal = ordinal
+    return card
+
+
+Card.all_cards = tuple(_make_card(ordinal) for ordinal in range(52))
+Card.names = tuple("%s of %s" % (Card.rank_names[card.rank], Card.suit_names[card.suit]) for card in Card.all_cards)
+
+
+# caches of method resolution, keyed by class; see ClassWatcher
+_defining_classes = {}
+_classify_tables = {}
+
+
+def clear_class_caches():
+    """
+        Empties the caches of method resolution
+
+        Setting or deleting an attribute of a class made by ClassWatcher does this
+        automatically; other classes are never cached.
+    """
+    _defining_classes.clear()
+    _classify_tables.clear()
+
+
+class ClassWatcher(type):
+    """
+        Metaclass that empties the caches of method resolution whenever an
+        attribute of one of its classes is set or deleted, as monkeypatching does
+    """
+    def __setattr__(cls, name, value):
+        type.__setattr__(cls, name, value)
+        clear_class_caches()
+
+    def __delattr__(cls, name):
+        type.__delattr__(cls, name)
+        clear_class_caches()
+
+
+class Deck(metaclass=ClassWatcher):
     """
         Represents a deck of cards
 
         attributes:
             cards: list of Card objects
     """
-    def __init__(self):
+    # the default random number generator for shuffle; None means the random module
+    rng = None
+
+    def __init__(self, rng=None):
         """
             Initializes the deck with 52 cards
+
+            rng: random number generator for shuffle; by default, the random module
         """
-        self.cards = []
-        for suit in range(4):
-            for rank in range(1, 14):
-                card = Card(suit, rank)
-                self.cards.append(card)
+        self.cards = list(Card.all_cards)
+        self.rng = rng
+
+
+    def reset(self):
+        """
+            Puts all 52 cards back in the deck, in order, reusing the list of cards
+        """
+        self.cards[:] = Card.all_cards
     
 
     def __str__(self):
@@ -106,10 +249,8 @@ class Deck:
 
             return: string 
         """
-        result = []
-        for card in self.cards:
-            result.append(str(card))
-        return "\n".join(result)
+        names = Card.names
+        return "\n".join([names[card.ordinal] for card in self.cards])
 
 
     def pop_card(self, i = 1):
@@ -132,11 +273,31 @@ class Deck:
         self.cards.append(card)
     
 
-    def shuffle(self):
+    def shuffle(self, rng=None, num=None):
         """
             Randomly shuffle the cards in the deck
+
+            Cards are dealt from the end of the deck, so shuffling only the last num
+            cards (a partial Fisher-Yates shuffle) deals them exactly as if the whole
+            deck had been shuffled.
+
+            rng: any object with shuffle and randrange methods, such as random.Random
+                or rngs.CounterRandom; by default, the deck's own rng
+            num: int; number of cards that will be dealt; by default, all of them
         """
-        random.shuffle(self.cards)
+        if rng is None:
+            rng = self.rng
+        if rng is None:
+            rng = random
+        cards = self.cards
+        if num is None or num >= len(cards):
+            rng.shuffle(cards)
+            return
+
+        randrange = rng.randrange
+        for i in range(len(cards) - 1, len(cards) - 1 - num, -1):
+            j = randrange(i + 1)
+            cards[i], cards[j] = cards[j], cards[i]
 
 
     def move_cards(self, hand, num):
@@ -173,6 +334,13 @@ class Hand(Deck):
         self.label = label
 
 
+    def reset(self):
+        """
+            Empties the hand so that it can be dealt again
+        """
+        self.cards.clear()
+
+
 def find_defining_class(obj, method_name):
     """
         Finds and determines the class object that will provide the definition of the method name if it is invoked on the object.
@@ -180,12 +348,25 @@ def find_defining_class(obj, method_name):
         obj: object
         method_name: string
 
-        return: type
+        return: type; cached per class for classes made by ClassWatcher, which clear
+            the cache when they change, and found afresh for any other class
     """
-    for ty in type(obj).mro():
+    cls = type(obj)
+    watched = isinstance(cls, ClassWatcher)
+    if watched:
+        key = (cls, method_name)
+        try:
+            return _defining_classes[key]
+        except KeyError:
+            pass
+    result = None
+    for ty in cls.mro():
         if method_name in ty.__dict__:
-            return ty
-    return None
+            result = ty
+            break
+    if watched:
+        _defining_classes[key] = result
+    return result
 
 class Hist(dict):
     """
@@ -213,32 +394,351 @@ class Hist(dict):
             del self[x]
 
 
+class ArrayHist:
+    """
+        A histogram over a fixed set of keys, backed by a list of counts.
+
+        It reads like a Hist: keys whose count is zero are left out of the
+        dict-like views.  Hot loops can skip the key lookup by updating counts
+        directly when the keys are range(n), since then a key is its own index.
+
+        attributes:
+            keys_list: tuple of the keys that can be counted
+            index: map from key to its position in counts
+            counts: list of int; the count of each key, in keys_list order
+    """
+
+    # map from keys, as a tuple or range, to the (keys_list, index) they share
+    _layouts = {}
+
+    def __init__(self, keys, seq=()):
+        """
+            Creates a new histogram starting with the items in seq.
+
+            keys: sequence of the keys that can be counted
+            seq: sequence of keys
+        """
+        # histograms over the same keys share one keys_list and index
+        layout = ArrayHist._layouts.get(keys) if type(keys) in (range, tuple) else None
+        if layout is None:
+            keys_list = tuple(keys)
+            layout = ArrayHist._layouts.get(keys_list)
+            if layout is None:
+                layout = (keys_list, {key: i for i, key in enumerate(keys_list)})
+                ArrayHist._layouts[keys_list] = layout
+            if type(keys) is range:
+                ArrayHist._layouts[keys] = layout
+        self.keys_list, self.index = layout
+        self.counts = [0] * len(self.keys_list)
+        for x in seq:
+            self.count(x)
+
+    def count(self, x, f=1):
+        """
+            Increments (or decrements) the counter associated with item x.
+
+            x: one of the keys
+            f: int
+        """
+        self.counts[self.index[x]] += f
+
+    def add_counts(self, counts):
+        """
+            Adds a list of counts, in keys_list order, to this histogram.
+
+            counts: sequence of int
+        """
+        self.counts = [a + b for a, b in zip(self.counts, counts)]
+
+    def update(self, other):
+        """
+            Adds the counts of another histogram to this one.
+
+            other: ArrayHist with the same keys, or any map from key to count
+        """
+        if isinstance(other, ArrayHist) and other.keys_list == self.keys_list:
+            self.add_counts(other.counts)
+        else:
+            for x, f in other.items():
+                self.count(x, f)
+
+    def clear(self):
+        """
+            Sets every count to zero.
+        """
+        self.counts[:] = [0] * len(self.counts)
+
+    def copy(self):
+        """
+            Returns a copy of this histogram.
+
+            return: ArrayHist
+        """
+        other = object.__new__(ArrayHist)
+        other.keys_list = self.keys_list
+        other.index = self.index
+        other.counts = list(self.counts)
+        return other
+
+    def get(self, x, default=None):
+        """
+            Returns the count of x, or default if it is zero.
+
+            x: key
+            default: value to return if x has not been counted
+        """
+        i = self.index.get(x)
+        if i is None or not self.counts[i]:
+            return default
+        return self.counts[i]
+
+    def __getitem__(self, x):
+        """
+            Returns the count of x.
+
+            x: key
+
+            return: int; raises KeyError if x has not been counted
+        """
+        result = self.get(x)
+        if result is None:
+            raise KeyError(x)
+        return result
+
+    def __setitem__(self, x, f):
+        """
+            Sets the count of x.
+
+            x: one of the keys
+            f: int
+        """
+        self.counts[self.index[x]] = f
+
+    def __contains__(self, x):
+        """
+            return: boolean; True if x has a nonzero count
+        """
+        return self.get(x) is not None
+
+    def __iter__(self):
+        """
+            return: iterator over the keys with a nonzero count
+        """
+        return iter(self.keys())
+
+    def __len__(self):
+        """
+            return: int; the number of keys with a nonzero count
+        """
+        return len(self.keys())
+
+    def __eq__(self, other):
+        """
+            Determines if this histogram has the same nonzero counts as another.
+
+            other: ArrayHist, Hist or dict
+
+            return: boolean
+        """
+        if not hasattr(other, 'items'):
+            return NotImplemented
+        return dict(self.items()) == dict(other.items())
+
+    def __repr__(self):
+        """
+            return: string
+        """
+        return 'ArrayHist(%r)' % dict(self.items())
+
+    def keys(self):
+        """
+            return: list of the keys with a nonzero count
+        """
+        return [key for key, f in zip(self.keys_list, self.counts) if f]
+
+    def values(self):
+        """
+            return: list of the nonzero counts
+        """
+        return [f for f in self.counts if f]
+
+    def items(self):
+        """
+            return: list of (key, count) pairs with a nonzero count
+        """
+        return [(key, f) for key, f in zip(self.keys_list, self.counts) if f]
+
+
 class PokerHand(Hand):
     """
         Represents a poker hand.
+
+        The suit and rank histograms and the card mask are kept up to date as
+        cards are added and removed, so add cards with add_card (or move_cards)
+        and remove them with pop_card or reset; after changing cards directly,
+        call make_histograms to bring them back in line.
+
+        attributes:
+            cards: list of Card objects
+            label: string
+            suits: ArrayHist; map from suit to number of cards
+            ranks: ArrayHist; map from rank to number of cards
+            mask: int; the evaluator card mask, with bit card.ordinal set for each card
+            best: string; the label of the strongest category, set by classify and
+                cleared, like flags and labels, whenever the cards change
+            flags: int; the evaluator flags, found by classify
+            labels: list of the labels of the hand, in all_labels order, built from
+                flags the first time they are used
     """
 
     all_labels = ['straightflush', 'fourkind', 'fullhouse', 'flush', 'straight', 'threekind', 'twopair', 'pair', 'highcard']
 
+    # whether classify may use the evaluator; False always runs the has_* predicates
+    evaluator_enabled = True
+
+    # empty histograms that each new hand copies, sharing their keys and index
+    _empty_suits = ArrayHist(range(4))
+    _empty_ranks = ArrayHist(range(15))
+
+    def __init__(self, label=""):
+        """
+            Initializes an empty hand.
+
+            label: string
+        """
+        Hand.__init__(self, label)
+        self.suits = self._empty_suits.copy()
+        self.ranks = self._empty_ranks.copy()
+        self.mask = 0
+        self.best = None
+        self._flags = None
+        self._labels = None
+        self._sets = None
+
+    @property
+    def sets(self):
+        """
+            The sorted list of the rank sets in the hand, made by make_sets when first
+            used after the cards change; the evaluator path of classify skips it.
+        """
+        if self._sets is None:
+            self.make_sets()
+        return self._sets
+
+    @sets.setter
+    def sets(self, sets):
+        self._sets = sets
+
+    @property
+    def flags(self):
+        """
+            The evaluator flags of the hand, bit c set for category c; if classify
+            skipped them, they are found by a full classify now.
+        """
+        if self._flags is None:
+            self.classify()
+        return self._flags
+
+    @flags.setter
+    def flags(self, flags):
+        self._flags = flags
+        self._labels = None
+
+    @property
+    def labels(self):
+        """
+            The labels of the hand in all_labels order, built from flags when first used.
+        """
+        if self._labels is None:
+            self._labels = evaluator.labels(self.flags)
+        return self._labels
+
+    @labels.setter
+    def labels(self, labels):
+        self._labels = labels
+
+    def add_card(self, card):
+        """
+            Adds a card to the hand and updates the histograms.
+
+            card: Card
+        """
+        self.cards.append(card)
+        # the keys of suits and ranks are their own indices
+        self.suits.counts[card.suit] += 1
+        self.ranks.counts[card.rank] += 1
+        self.mask |= 1 << card.ordinal
+        # the cards changed, so any classification is out of date
+        self.best = self._flags = self._labels = self._sets = None
+
+    def pop_card(self, i = 1):
+        """
+            Removes the last card from the hand and updates the histograms.
+
+            return: Card
+        """
+        card = self.cards.pop()
+        self.suits.counts[card.suit] -= 1
+        self.ranks.counts[card.rank] -= 1
+        # if the hand held this card twice, the mask has lost a card it still
+        # holds; current_mask rebuilds it when it is used
+        self.mask &= ~(1 << card.ordinal)
+        self.best = self._flags = self._labels = self._sets = None
+        return card
+
+    def reset(self):
+        """
+            Empties the hand so that it can be dealt again.
+        """
+        self.cards.clear()
+        self.suits.clear()
+        self.ranks.clear()
+        self.mask = 0
+        self.best = self._flags = self._labels = self._sets = None
+
     def make_histograms(self):
         """
-            Computes histograms for suits and hands.
+            Computes histograms for suits and hands from scratch.
             
             Creates attributes:
                 suits: a histogram of the suits in the hand.
                 ranks: a histogram of the ranks.
                 sets: a sorted list of the rank sets in the hand.
+                mask: the evaluator card mask.
         """
-        # Instantiate Hist
-        self.suits = Hist()
-        self.ranks = Hist()
+        # Instantiate ArrayHist
+        self.suits = ArrayHist(range(4))
+        self.ranks = ArrayHist(range(15))
         
         for c in self.cards:
             self.suits.count(c.suit)
             self.ranks.count(c.rank)
 
-        self.sets = list(self.ranks.values())
-        self.sets.sort(reverse=True)
+        self.mask = evaluator.hand_mask(self.cards)
+        self.best = self._flags = self._labels = self._sets = None
+        self.make_sets()
+
+    def current_mask(self):
+        """
+            Returns the evaluator card mask, first rebuilding it from the cards if it
+            no longer matches them, as after popping one of two copies of a card.
+
+            return: int
+        """
+        if evaluator.card_count(self.mask) != len(self.cards):
+            self.mask = evaluator.hand_mask(self.cards)
+        return self.mask
+
+    def make_sets(self):
+        """
+            Computes the sorted list of the rank sets in the hand from the rank histogram.
+
+            Creates attributes:
+                sets: a sorted list of the rank sets in the hand.
+        """
+        sets = list(self.ranks.values())
+        sets.sort(reverse=True)
+        self.sets = sets
  
     def has_highcard(self):
         """
@@ -350,34 +850,102 @@ class PokerHand(Hand):
             
             return: boolean; True if this hand has a flush, false otherwise
         """
-        # partition the hand by suit and check each sub-hand for a straight
-        d = {}
-        for c in self.cards:
-            d.setdefault(c.suit, PokerHand()).add_card(c)
-
-        # determine if any of the partitioned hands has a straight
-        for hand in d.values():
-            if len(hand.cards) < 5:
-                continue            
-            hand.make_histograms()
-            if hand.has_straight():
-                return True
-        return False
+        # look for a straight among the ranks held in each suit
+        return bool(evaluator.evaluate(self.current_mask()) & (1 << evaluator.STRAIGHTFLUSH))
+
+    def strength(self, board=()):
+        """
+            Computes the strength key of the best five cards in this hand.
+
+            board: sequence of Card; community cards shared with other hands
+
+            return: int; of two hands, the one with the larger key wins
+        """
+        mask = self.current_mask() | evaluator.hand_mask(board)
+        if evaluator.card_count(mask) == 5:
+            # five cards are a single lookup in the precomputed table
+            return ranktable.strength(mask)
+        return evaluator.strength(mask)
+
+    def classify_table(self):
+        """
+            Finds the has_* predicates of this hand's class, in all_labels order,
+            once per class; the table is rebuilt after the class is changed.
 
-    def classify(self):
+            return: tuple (uses_evaluator, predicates); predicates is a list of
+                (label, flag, function) with flag the evaluator bit of the label
+        """
+        cls = type(self)
+        table = _classify_tables.get(cls)
+        if table is None:
+            predicates = [(label, 1 << evaluator.CATEGORIES.index(label), getattr(cls, 'has_' + label))
+                          for label in PokerHand.all_labels]
+            # the evaluator stands in for the stock predicates only; a wrapper, such
+            # as instrument's, counts as stock if its __wrapped__ is
+            uses_evaluator = cls.evaluator_enabled and all(getattr(f, '__wrapped__', f) is _stock_predicates[label]
+                                                           for label, flag, f in predicates)
+            table = _classify_tables[cls] = (uses_evaluator, predicates)
+        return table
+
+    def uses_evaluator(self):
+        """
+            Determines if this hand can be classified by the table-driven evaluator,
+            which is the case unless its class overrides one of the has_* predicates.
+
+            return: boolean
+        """
+        return self.classify_table()[0]
+
+    def classify(self, best_only=False):
         """
             Classifies this hand.
-        
+
+            best_only: boolean; whether to stop at the strongest category, checking
+                the predicates from strongest to weakest; flags and labels are then
+                found only if they are used
+
             Creates attributes:
-                labels:
-        """
-        self.make_histograms()
+                best: the label of the strongest category, None if there is none
+                flags: the labels as evaluator flags, bit c set for category c
+                labels: list of the labels of the hand, in all_labels order
 
-        self.labels = []
-        for label in PokerHand.all_labels:
-            f = getattr(self, 'has_' + label)
-            if f():
-                self.labels.append(label)
+            return: string; best
+        """
+        uses_evaluator, predicates = self.classify_table()
+        self._labels = None
+        # the predicates pass vacuously on hands with fewer than two ranks, so the
+        # evaluator only agrees with them from five cards up, and only without duplicates
+        if uses_evaluator and len(self.cards) >= 5:
+            mask = self.current_mask()
+            if evaluator.card_count(mask) == len(self.cards):
+                self._flags = flags = evaluator.evaluate(mask)
+                self.best = evaluator.BEST_LABEL[flags]
+                return self.best
+
+        self.make_sets()
+
+        if best_only:
+            # all_labels runs from strongest to weakest
+            self._flags = None
+            for label, flag, f in predicates:
+                if f(self):
+                    self.best = label
+                    return label
+            self._flags = 0
+            self.best = None
+            return None
+
+        flags = 0
+        for label, flag, f in predicates:
+            if f(self):
+                flags |= flag
+        self._flags = flags
+        self.best = evaluator.BEST_LABEL[flags]
+        return self.best
+
+
+# map from label to the has_* predicate PokerHand was defined with, before any patching
+_stock_predicates = {label: vars(PokerHand)['has_' + label] for label in PokerHand.all_labels}
 
 
 class PokerDeck(Deck):
@@ -392,37 +960,286 @@ class PokerDeck(Deck):
             
             return: list of Hands
         """
-        # Initialize a list
-        hands = []
+        return list(self.iter_hands(num_cards, num_hands))
+
+    def iter_hands(self, num_cards=5, num_hands=10, classify=True):
+        """
+            Deals hands from the deck one at a time, as they are consumed.
+            num_cards: cards per hand
+            num_hands: number of hands
+            classify: boolean; whether to classify each hand before yielding it
+
+            return: generator of PokerHand
+        """
         for i in range(num_hands):
             # Instantiate Pokerhand
             hand = PokerHand()
             self.move_cards(hand, num_cards)
-            hand.classify()
-            hands.append(hand)
-        return hands
+            if classify:
+                hand.classify()
+            yield hand
 
 
-def main():
+    def deal_into(self, hands, num_cards=5, classify=True):
+        """
+            Deals into existing hands, emptying them first, so they can be reused.
+            hands: list of PokerHand
+            num_cards: cards per hand
+            classify: boolean; whether to classify each hand
+        """
+        for hand in hands:
+            hand.reset()
+            self.move_cards(hand, num_cards)
+            if classify:
+                hand.classify()
+
+
+def deal_stream(num_cards=5, num_hands=10, decks=None, rng=None, classify=True):
+    """
+        Deals hands from a sequence of freshly shuffled decks, one hand at a time.
+
+        num_cards: cards per hand
+        num_hands: hands per deck
+        decks: number of decks; by default, the stream never ends
+        rng: random number generator for Deck.shuffle; by default, the random module
+        classify: boolean; whether to classify each hand before yielding it
+
+        return: generator of PokerHand
+    """
+    deck = PokerDeck()
+    counter = itertools.count() if decks is None else range(decks)
+    for i in counter:
+        deck.reset()
+        deck.shuffle(rng, num_cards * num_hands)
+        yield from deck.iter_hands(num_cards, num_hands, classify)
+
+
+def showdown(hands, board=()):
+    """
+        Finds the winners among hands that go to showdown.
+
+        hands: sequence of PokerHand
+        board: sequence of Card; community cards shared by all the hands
+
+        return: list of PokerHand; the winner, or the hands that split the pot
+    """
+    board_mask = evaluator.hand_mask(board)
+    masks = [hand.current_mask() | board_mask for hand in hands]
+    if all(evaluator.card_count(mask) == 5 for mask in masks):
+        keys = [ranktable.strength(mask) for mask in masks]
+    else:
+        keys = [evaluator.strength(mask) for mask in masks]
+    return [hands[i] for i in evaluator.winners(keys)]
+
+
+def split(n, parts):
+    """
+        Splits n into parts nearly equal, non-negative integers
+
+        n: int
+        parts: int
+
+        return: list of int
+    """
+    size, extra = divmod(n, parts)
+    return [size + (1 if i < extra else 0) for i in range(parts)]
+
+
+def spans(n, parts):
+    """
+        Splits range(n) into at most parts runs of consecutive integers, leaving out empty runs
+
+        n: int
+        parts: int
+
+        return: list of tuple (start, stop)
+    """
+    result = []
+    start = 0
+    for size in split(n, parts):
+        if size:
+            result.append((start, start + size))
+        start += size
+    return result
+
+
+def count_flags(tally, lhist=None):
+    """
+        Adds a tally of evaluator flags to a label histogram
+
+        tally: list of int; the number of hands with each value of the evaluator flags
+        lhist: Hist or ArrayHist to add the counts to; by default, a new ArrayHist
+
+        return: lhist
+    """
+    if lhist is None:
+        lhist = ArrayHist(PokerHand.all_labels)
+    for flags, freq in enumerate(tally):
+        if freq:
+            for label in evaluator.LABEL_TABLE[flags]:
+                lhist.count(label, freq)
+    return lhist
+
+
+def simulate(n, num_cards=7, num_hands=7, rng=None, lhist=None, verbose=False):
+    """
+        Deals num_hands hands of num_cards cards from each of n shuffled decks
+
+        n: number of decks
+        num_cards: cards per hand
+        num_hands: hands per deck
+        rng: random number generator for Deck.shuffle; by default, the random module
+        lhist: Hist or ArrayHist to add the counts to; by default, a new ArrayHist
+        verbose: boolean; whether to print progress every 1000 decks
+
+        return: map from label to number of occurrences
+    """
     # the label histogram: map from label to number of occurances
-    lhist = Hist()
+    if lhist is None:
+        lhist = ArrayHist(PokerHand.all_labels)
+
+    # count the evaluator flags of each hand, and the labels they stand for at the end
+    tally = [0] * len(evaluator.LABEL_TABLE)
+
+    # one deck and one set of hands, reused for every deal
+    deck = PokerDeck()
+    hands = [PokerHand() for i in range(num_hands)]
 
-    # loop n times, dealing 7 hands per iteration, 7 cards each
-    n = 10000
     for i in range(n):
-        if i % 1000 == 0:
+        if verbose and i % 1000 == 0:
             print(i)
             
-        deck = PokerDeck()
-        deck.shuffle()
+        deck.reset()
+        deck.shuffle(rng, num_cards * num_hands)
 
-        hands = deck.deal_hands(7, 7)
+        deck.deal_into(hands, num_cards)
         for hand in hands:
-            for label in hand.labels:
-                lhist.count(label)
-            
-    # print the results
-    total = 7.0 * n
+            tally[hand.flags] += 1
+
+    return count_flags(tally, lhist)
+
+
+def relative_errors(lhist, total, labels=None, confidence=0.95):
+    """
+        Estimates the precision of each "one time in X" frequency.
+
+        X is total / freq; to first order, the half-width of its confidence interval
+        relative to X is that of the probability freq / total, treating the hands
+        as independent trials.
+
+        lhist: Hist or ArrayHist; map from label to number of occurrences
+        total: number of hands dealt
+        labels: the labels to check; by default, all_labels
+        confidence: float; the confidence level of the intervals
+
+        return: map from label to relative half-width; inf for labels not yet seen
+    """
+    if labels is None:
+        labels = PokerHand.all_labels
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    errors = {}
+    for label in labels:
+        freq = lhist.get(label, 0)
+        if freq == 0:
+            errors[label] = math.inf
+        else:
+            p = freq / total
+            errors[label] = z * math.sqrt((1 - p) / freq)
+    return errors
+
+
+# the fewest cards that can make each label
+_min_cards = {'straightflush': 5, 'fourkind': 4, 'fullhouse': 5, 'flush': 5, 'straight': 5,
+              'threekind': 3, 'twopair': 4, 'pair': 2, 'highcard': 1}
+
+
+def simulate_until(precision=None, seconds=None, labels=None, confidence=0.95, num_cards=7, num_hands=7,
+                   batch=1000, rng=None, lhist=None, verbose=False):
+    """
+        Deals decks in batches until every requested frequency is known to the
+        given relative precision, or until the time runs out.
+
+        precision: float; the target relative half-width of each confidence interval
+        seconds: float; the time budget; at least one of precision and seconds is needed
+        labels: the labels whose precision to check; by default, all_labels, or
+            without a time budget, those that a hand of num_cards can make
+        confidence: float; the confidence level of the intervals
+        num_cards: cards per hand
+        num_hands: hands per deck
+        batch: number of decks dealt between checks
+        rng: random number generator for Deck.shuffle; by default, the random module
+        lhist: Hist or ArrayHist to add the counts to; by default, a new ArrayHist
+        verbose: boolean; whether to print the worst precision after every batch
+
+        return: tuple (lhist, total, errors, elapsed); the counts, the number of hands,
+            the map from label to relative half-width, and the seconds taken
+    """
+    if precision is None and seconds is None:
+        raise ValueError("simulate_until needs a precision or a time budget")
+    if seconds is None:
+        # a label that never happens never reaches the precision
+        if labels is None:
+            labels = [label for label in PokerHand.all_labels if _min_cards[label] <= num_cards]
+        unreachable = [label for label in labels if _min_cards[label] > num_cards]
+        if unreachable:
+            raise ValueError("hands of %d cards cannot make %s; give a time budget"
+                             % (num_cards, ', '.join(unreachable)))
+    if lhist is None:
+        lhist = ArrayHist(PokerHand.all_labels)
+
+    start = time.perf_counter()
+    total = 0
+    while True:
+        simulate(batch, num_cards, num_hands, rng, lhist)
+        total += batch * num_hands
+        errors = relative_errors(lhist, total, labels, confidence)
+        elapsed = time.perf_counter() - start
+        worst = max(errors.values())
+        if verbose:
+            print('%d hands, worst relative error %.4f' % (total, worst))
+        if precision is not None and worst <= precision:
+            break
+        if seconds is not None and elapsed >= seconds:
+            break
+    return lhist, total, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Estimate how often each kind of poker hand happens.')
+    parser.add_argument('--precision', type=float,
+                        help='deal until every estimate is within this relative error, such as 0.01')
+    parser.add_argument('--seconds', type=float, help='deal for at most this many seconds')
+    parser.add_argument('--labels', nargs='+', choices=PokerHand.all_labels,
+                        help='the labels whose precision to check; by default, all of them')
+    parser.add_argument('--confidence', type=float, default=0.95)
+    args = parser.parse_args()
+
+    if args.precision is None and args.seconds is None:
+        # loop n times, dealing 7 hands per iteration, 7 cards each
+        n = 10000
+        lhist = simulate(n, 7, 7, verbose=True)
+
+        # print the results
+        print_report(lhist, 7.0 * n)
+        return
+
+    lhist, total, errors, elapsed = simulate_until(args.precision, args.seconds, args.labels, args.confidence,
+                                                   verbose=True)
+    print_report(lhist, total, relative_errors(lhist, total, confidence=args.confidence))
+    worst = max(errors, key=errors.get)
+    print('worst relative error %.4f (%s) at %.0f%% confidence' % (errors[worst], worst, 100 * args.confidence))
+    print('%.0f hands per second' % (total / elapsed))
+
+
+def print_report(lhist, total, errors=None):
+    """
+        Prints how often each label happens.
+
+        lhist: Hist; map from label to number of occurrences
+        total: number of hands dealt
+        errors: map from label to relative half-width, such as relative_errors returns;
+            if given, each line shows the precision of its estimate
+    """
     print(total, 'hands dealt:')
 
     for label in PokerHand.all_labels:
@@ -430,7 +1247,10 @@ def main():
         if freq == 0: 
             continue
         p = total / freq
-        print('%s happens one time in %.2f' % (label, p))
+        if errors is None:
+            print('%s happens one time in %.2f' % (label, p))
+        else:
+            print('%s happens one time in %.2f (+/- %.2f%%)' % (label, p, 100 * errors[label]))
 
         
 if __name__ == '__main__':
@@ -0,0 +1,214 @@
+"""
+    This module contains the precomputed table of 5-card hand strengths
+
+    The table holds evaluator.strength of every 5-card hand, as a 32-bit integer,
+    indexed by the colexicographic rank of the hand (see exact.rank).  It is
+    generated once, saved to disk, and memory-mapped read-only the first time it
+    is needed, so importing this module costs nothing, and every process that
+    maps the file shares the same pages.
+
+    The file is POKER_RANK_TABLE from the environment if set, otherwise
+    handranks5.bin in the user's cache directory.  Run this module to build it
+    ahead of time; otherwise the first process to need it builds it, which takes
+    a few seconds; any other process that needs it meanwhile falls back on
+    evaluator.strength until it is done, and one that cannot read or write it
+    always does.
+
+    Note: Using Python 3.9.0
+"""
+import array
+import mmap
+import os
+import struct
+import sys
+import time
+from math import comb
+
+import evaluator
+
+
+MAGIC = b'PKRT'
+VERSION = 1
+HEADER = struct.Struct('<4sII4x')
+SIZE = comb(52, 5)
+
+DEFAULT_PATH = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.environ.get('LOCALAPPDATA')
+                            or os.path.join(os.path.expanduser('~'), '.cache'), 'poker', 'handranks5.bin')
+
+# a lock file older than this many seconds was left by a process that died while building the table
+STALE_LOCK = 300
+# while another process builds the table, look for it again after this many seconds
+RETRY_LOCK = 1.0
+
+# COMB_i[c + 1]: comb(c, i), what the ith lowest card of a hand, c, adds to its colex rank;
+# offset by one so that they can be indexed by the bit length of the card's bit
+COMB_2, COMB_3, COMB_4, COMB_5 = (tuple(comb(c - 1, i) if c else 0 for c in range(53)) for i in range(2, 6))
+
+# the mapped table, once loaded
+_map = None
+_table = None
+# True once this process has found that it cannot use the table
+_unavailable = False
+# time.monotonic() before which not to look for a table that another process is building
+_retry_at = 0.0
+
+
+def table_path():
+    """
+        Finds the file that holds the table
+
+        return: string
+    """
+    return os.environ.get('POKER_RANK_TABLE', DEFAULT_PATH)
+
+
+def generate(path=None):
+    """
+        Computes the table and writes it to disk, replacing the file atomically
+
+        path: string; by default, table_path()
+    """
+    if path is None:
+        path = table_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    strength = evaluator.strength
+    bits = [1 << c for c in range(52)]
+    table = array.array('I')
+
+    # nested loops with the highest card outermost walk the hands in colex order
+    for c4 in range(4, 52):
+        m4 = bits[c4]
+        for c3 in range(3, c4):
+            m3 = m4 | bits[c3]
+            for c2 in range(2, c3):
+                m2 = m3 | bits[c2]
+                for c1 in range(1, c2):
+                    m1 = m2 | bits[c1]
+                    table.extend([strength(m1 | bits[c0]) for c0 in range(c1)])
+    assert len(table) == SIZE
+    if sys.byteorder != 'little':
+        table.byteswap()
+
+    temp = '%s.%d.tmp' % (path, os.getpid())
+    with open(temp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, SIZE))
+        table.tofile(f)
+    os.replace(temp, path)
+
+
+def load(path=None):
+    """
+        Maps the table, generating it first if the file does not exist
+
+        path: string; by default, table_path()
+
+        return: memoryview of SIZE 32-bit strengths
+    """
+    global _map, _table
+    if _table is not None:
+        return _table
+    if path is None:
+        path = table_path()
+    if not os.path.exists(path):
+        generate(path)
+
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, size = HEADER.unpack_from(mapped)
+    if magic != MAGIC or version != VERSION or size != SIZE or len(mapped) != HEADER.size + 4 * SIZE:
+        mapped.close()
+        raise ValueError("%s is not a version %d hand-rank table" % (path, VERSION))
+    if sys.byteorder != 'little':
+        mapped.close()
+        raise NotImplementedError("the hand-rank table can only be mapped on little-endian hosts")
+
+    _map = mapped
+    _table = memoryview(mapped)[HEADER.size:].cast('I')
+    return _table
+
+
+def mask_rank(mask):
+    """
+        Computes the colex rank of the 5-card hand in a card mask
+
+        mask: int; exactly five bits set
+
+        return: int
+    """
+    # take the cards lowest first; the ith lowest card c adds comb(c, i)
+    low = mask & -mask
+    r = low.bit_length() - 1
+    mask ^= low
+    low = mask & -mask
+    r += COMB_2[low.bit_length()]
+    mask ^= low
+    low = mask & -mask
+    r += COMB_3[low.bit_length()]
+    mask ^= low
+    low = mask & -mask
+    return r + COMB_4[low.bit_length()] + COMB_5[(mask ^ low).bit_length()]
+
+
+def try_load():
+    """
+        Maps the table if it can be used, building it first if it is missing and no
+        other process is building it; never raises
+
+        return: memoryview, or None if evaluator.strength should be used instead
+    """
+    global _unavailable, _retry_at
+    if _table is not None:
+        return _table
+    if _unavailable or time.monotonic() < _retry_at:
+        return None
+    path = table_path()
+    try:
+        if not os.path.exists(path):
+            lock = path + '.lock'
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            try:
+                if time.time() - os.path.getmtime(lock) > STALE_LOCK:
+                    os.remove(lock)
+            except OSError:
+                pass
+            try:
+                os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            except FileExistsError:
+                # another process is building it; use it once it is done
+                _retry_at = time.monotonic() + RETRY_LOCK
+                return None
+            try:
+                generate(path)
+            finally:
+                os.remove(lock)
+        return load(path)
+    except (OSError, ValueError, NotImplementedError):
+        _unavailable = True
+        return None
+
+
+def strength(mask):
+    """
+        Looks up the strength of a 5-card hand
+
+        mask: int; exactly five bits set
+
+        return: int; the same as evaluator.strength(mask)
+    """
+    table = _table if _table is not None else try_load()
+    if table is None:
+        return evaluator.strength(mask)
+    return table[mask_rank(mask)]
+
+
+def main():
+    """
+        Builds the table, replacing any old one, and prints where it is
+    """
+    path = table_path()
+    generate(path)
+    print('wrote', path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,285 @@
+"""
+    This module estimates the frequencies of rare poker hands by stratified sampling
+
+    Every hand has a suit pattern, the numbers of its cards in each suit from most
+    to fewest, and a rank pattern, the numbers of its cards of each rank.  The
+    probability of each pattern is known exactly, and a hand with a given pattern
+    can be dealt uniformly at random, so the hands are split into strata by
+    pattern and each stratum is sampled on its own.  Straight flushes and flushes
+    only happen with five or more cards of a suit, and four of a kind only with
+    four cards of a rank, so the few strata where rare hands happen get most of
+    the samples.  Weighting each stratum's frequencies by its probability gives
+    unbiased estimates, with error bars from the variance within each stratum.
+
+    A pilot run of each stratum decides how to share out the samples, by Neyman
+    allocation on the relative error of the requested labels; the pilot hands are
+    not counted, so that the allocation cannot bias the estimates.
+
+    Note: Using Python 3.9.0
+"""
+import argparse
+import math
+import random
+from math import comb, factorial
+from statistics import NormalDist
+
+import evaluator
+from poker import Card, PokerDeck, PokerHand, count_flags
+
+
+SUITS = 'suits'
+RANKS = 'ranks'
+
+
+def partitions(n, parts, largest):
+    """
+        Lists the ways to split n cards into at most parts groups of at most largest cards
+
+        n: int
+        parts: int
+        largest: int
+
+        return: list of tuple of int; each from largest to smallest, without zeros
+    """
+    if n == 0:
+        return [()]
+    result = []
+    if parts == 0:
+        return result
+    for first in range(min(n, largest), 0, -1):
+        for rest in partitions(n - first, parts - 1, first):
+            result.append((first,) + rest)
+    return result
+
+
+def strata(num_cards=7, by=SUITS):
+    """
+        Lists the patterns of a hand and the number of hands with each
+
+        num_cards: cards per hand
+        by: SUITS or RANKS
+
+        return: list of tuple (pattern, hands); the hands add up to comb(52, num_cards)
+    """
+    if by == SUITS:
+        groups, size = 4, 13
+    elif by == RANKS:
+        groups, size = 13, 4
+    else:
+        raise ValueError("unknown stratification %r" % (by,))
+
+    result = []
+    for pattern in partitions(num_cards, groups, size):
+        # the ways to give the counts of the pattern to distinct suits (or ranks),
+        # where groups with the same count are interchangeable
+        ways = factorial(groups) // factorial(groups - len(pattern))
+        for count in set(pattern):
+            ways //= factorial(pattern.count(count))
+        hands = ways
+        for count in pattern:
+            hands *= comb(size, count)
+        result.append((pattern, hands))
+    return result
+
+
+class StratifiedDeck(PokerDeck):
+    """
+        Represents a deck of cards that can deal a hand with a given suit or rank pattern
+    """
+    def deal_pattern(self, hand, pattern, by=SUITS, rng=random):
+        """
+            Moves a hand with the given pattern from the deck to hand, uniformly at
+            random among the hands with that pattern; the deck must be full
+
+            hand: PokerHand
+            pattern: tuple of int; from strata
+            by: SUITS or RANKS
+            rng: random number generator with sample
+        """
+        if by == SUITS:
+            ordinals = [suit * 13 + rank
+                        for suit, count in zip(rng.sample(range(4), len(pattern)), pattern)
+                        for rank in rng.sample(range(13), count)]
+        else:
+            ordinals = [suit * 13 + rank
+                        for rank, count in zip(rng.sample(range(13), len(pattern)), pattern)
+                        for suit in rng.sample(range(4), count)]
+
+        cards = Card.all_cards
+        mask = 0
+        for ordinal in ordinals:
+            hand.add_card(cards[ordinal])
+            mask |= 1 << ordinal
+        self.cards[:] = [card for card in self.cards if not (mask >> card.ordinal) & 1]
+
+
+class RareEstimate:
+    """
+        Represents stratified estimates of how often each label happens
+
+        attributes:
+            labels: list of string; in all_labels order
+            freqs: map from label to estimated probability per hand
+            errors: map from label to half-width of the confidence interval on the probability
+            samples: int; number of hands counted, not including the pilot
+            uniform: map from label to the number of uniformly dealt hands that
+                would give the same error
+    """
+    def __init__(self, weights, sizes, counts, z):
+        """
+            Combines the counts of each stratum
+
+            weights: list of float; the probability of each stratum
+            sizes: list of int; the number of hands counted in each stratum
+            counts: list of ArrayHist; the label counts of each stratum
+            z: float; number of standard errors in the confidence interval
+        """
+        self.labels = PokerHand.all_labels
+        self.freqs = {}
+        self.errors = {}
+        self.uniform = {}
+        for label in self.labels:
+            freq = 0.0
+            variance = 0.0
+            for weight, size, hist in zip(weights, sizes, counts):
+                p = hist.get(label, 0) / size
+                freq += weight * p
+                if size > 1:
+                    variance += weight * weight * p * (1 - p) / (size - 1)
+            self.freqs[label] = freq
+            self.errors[label] = z * math.sqrt(variance)
+            self.uniform[label] = freq * (1 - freq) / variance if variance else math.inf
+        self.samples = sum(sizes)
+
+
+    def __str__(self):
+        """
+            Returns a human-readable representation of the estimates
+
+            return: string
+        """
+        result = []
+        for label in self.labels:
+            freq = self.freqs[label]
+            if freq == 0:
+                continue
+            if self.errors[label] == 0:
+                # the label is fixed within every stratum
+                result.append('%s happens one time in %.2f, with no sampling error' % (label, 1 / freq))
+            else:
+                result.append('%s happens one time in %.2f (+/- %.2f%%), as precise as %.3g uniform hands'
+                              % (label, 1 / freq, 100 * self.errors[label] / freq, self.uniform[label]))
+        result.append('%d hands sampled' % self.samples)
+        return "\n".join(result)
+
+
+def sample_stratum(deck, hand, pattern, by, size, rng):
+    """
+        Deals hands with one pattern and counts their labels
+
+        deck: StratifiedDeck
+        hand: PokerHand
+        pattern: tuple of int
+        by: SUITS or RANKS
+        size: number of hands
+        rng: random number generator
+
+        return: ArrayHist; map from label to number of hands
+    """
+    tally = [0] * len(evaluator.LABEL_TABLE)
+    for i in range(size):
+        deck.reset()
+        hand.reset()
+        deck.deal_pattern(hand, pattern, by, rng)
+        hand.classify()
+        tally[hand.flags] += 1
+    return count_flags(tally)
+
+
+def allocate(samples, weights, pilots, pilot, labels):
+    """
+        Shares out hands among the strata by Neyman allocation on the relative
+        errors of the labels, using the frequencies seen in the pilot
+
+        samples: total number of hands to share out
+        weights: list of float; the probability of each stratum
+        pilots: list of ArrayHist; the label counts of the pilot of each stratum
+        pilot: number of hands in each pilot
+        labels: the labels whose error to minimize
+
+        return: list of int; the number of hands for each stratum
+    """
+    freqs = [[hist.get(label, 0) / pilot for label in labels] for hist in pilots]
+    overall = [sum(weight * freq[i] for weight, freq in zip(weights, freqs)) for i in range(len(labels))]
+
+    # a stratum's share is its weight times the largest relative standard deviation it adds
+    needs = []
+    for weight, freq in zip(weights, freqs):
+        need = 0.0
+        for p, total in zip(freq, overall):
+            if total:
+                need = max(need, math.sqrt(p * (1 - p)) / total)
+        needs.append(weight * need)
+    if not any(needs):
+        needs = weights
+    total_need = sum(needs)
+    return [round(samples * need / total_need) for need in needs]
+
+
+def estimate(samples=200000, num_cards=7, by=SUITS, labels=None, pilot=200, confidence=0.95, rng=None):
+    """
+        Estimates how often each label happens by stratified sampling
+
+        samples: number of hands to deal after the pilot
+        num_cards: cards per hand
+        by: SUITS or RANKS; SUITS suits flushes and straight flushes, RANKS four
+            of a kind, full houses and three of a kind
+        labels: the labels whose error to minimize; by default, all_labels
+        pilot: number of hands dealt from each stratum to decide the allocation;
+            every stratum also gets at least this many counted hands
+        confidence: float; the confidence level of the intervals
+        rng: random number generator; by default, a new random.Random
+
+        return: RareEstimate
+    """
+    if rng is None:
+        rng = random.Random()
+    if labels is None:
+        labels = PokerHand.all_labels
+    total = comb(52, num_cards)
+    patterns = strata(num_cards, by)
+    weights = [hands / total for pattern, hands in patterns]
+
+    deck = StratifiedDeck()
+    hand = PokerHand()
+    pilots = [sample_stratum(deck, hand, pattern, by, pilot, rng) for pattern, hands in patterns]
+
+    sizes = [max(pilot, size) for size in allocate(samples, weights, pilots, pilot, labels)]
+    counts = [sample_stratum(deck, hand, pattern, by, size, rng)
+              for (pattern, hands), size in zip(patterns, sizes)]
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    return RareEstimate(weights, sizes, counts, z)
+
+
+def main():
+    """
+        Estimates the frequencies of rare hands and prints them
+    """
+    parser = argparse.ArgumentParser(description='Estimate the frequencies of rare poker hands by stratified sampling.')
+    parser.add_argument('--samples', type=int, default=200000, help='number of hands to deal after the pilot')
+    parser.add_argument('--cards', type=int, default=7, help='cards per hand')
+    parser.add_argument('--by', choices=[SUITS, RANKS], default=SUITS,
+                        help='stratify by suit pattern (flushes) or rank pattern (four of a kind)')
+    parser.add_argument('--labels', nargs='+', choices=PokerHand.all_labels,
+                        help='the labels whose error to minimize; by default, all of them')
+    parser.add_argument('--pilot', type=int, default=200, help='pilot hands per stratum')
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument('--seed', type=int, help='seed for the random number generator')
+    args = parser.parse_args()
+
+    print(estimate(args.samples, args.cards, args.by, args.labels, args.pilot, args.confidence,
+                   random.Random(args.seed)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+    This module re-classifies the hands stored in a hand log, in parallel
+
+    The records of a log (see handlog) are split into chunks of consecutive
+    hands.  Each worker process maps the log itself, so the workers share its
+    pages, and classifies its chunks with PokerHand.classify, or the classify of
+    a PokerHand subclass with changed rules.  Each chunk gives its own label
+    counts, which can be saved and merged, and the merged counts are printed as
+    the same "happens one time in X" report as poker.main.
+
+        python rescore.py hands.log --workers 8 --json chunks.json
+
+    Note: Using Python 3.9.0
+"""
+import argparse
+import json
+import os
+from multiprocessing import Pool
+
+import evaluator
+import handlog
+import poker
+
+
+def score_chunk(args):
+    """
+        Classifies a run of consecutive hands in a log
+
+        args: tuple (path, start, stop, hand_class); the log, the range of hands
+            and the PokerHand class whose classify to use
+
+        return: dict; the range of hands, the number of hands and the label counts
+    """
+    path, start, stop, hand_class = args
+    lhist = poker.ArrayHist(poker.PokerHand.all_labels)
+    hand = hand_class()
+
+    with handlog.HandLog(path) as log:
+        if type(hand).classify is poker.PokerHand.classify and hand.uses_evaluator() and log.cards_per_hand >= 5:
+            # classify reduces to the evaluator for these hands, so skip building them;
+            # a class with its own classify or has_* predicates takes the loop below
+            tally = [0] * len(evaluator.LABEL_TABLE)
+            for i in range(start, stop):
+                mask = log.mask(i)
+                if evaluator.card_count(mask) == log.cards_per_hand:
+                    tally[evaluator.evaluate(mask)] += 1
+                else:
+                    hand = log.hand(i)
+                    hand.classify()
+                    for label in hand.labels:
+                        lhist.count(label)
+            poker.count_flags(tally, lhist)
+        else:
+            card = poker.Card.from_ordinal
+            for i in range(start, stop):
+                hand.reset()
+                for ordinal in log.ordinals(i):
+                    hand.add_card(card(ordinal))
+                hand.classify()
+                for label in hand.labels:
+                    lhist.count(label)
+
+    return {'start': start, 'stop': stop, 'hands': stop - start, 'counts': dict(lhist.items())}
+
+
+def chunks(path, total, num_chunks, hand_class):
+    """
+        Splits the hands of a log into runs of consecutive hands
+
+        path: string
+        total: number of hands in the log
+        num_chunks: int
+        hand_class: PokerHand class
+
+        return: list of tuple (path, start, stop, hand_class)
+    """
+    return [(path, start, stop, hand_class) for start, stop in poker.spans(total, num_chunks)]
+
+
+def merge(results):
+    """
+        Merges the results of score_chunk
+
+        results: iterable of dict
+
+        return: tuple (ArrayHist, total); the label counts and the number of hands
+    """
+    lhist = poker.ArrayHist(poker.PokerHand.all_labels)
+    total = 0
+    for result in results:
+        lhist.update(result['counts'])
+        total += result['hands']
+    return lhist, total
+
+
+def rescore(path, workers=None, num_chunks=None, hand_class=poker.PokerHand):
+    """
+        Classifies every hand in a log over a process pool
+
+        path: string
+        workers: number of processes; by default, the number of CPUs
+        num_chunks: number of pieces of work; by default, 16 per worker
+        hand_class: PokerHand class whose classify to use; it must be importable by the workers
+
+        return: list of dict; the result of each chunk, in order
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if num_chunks is None:
+        num_chunks = 16 * workers
+    with handlog.HandLog(path) as log:
+        total = len(log)
+
+    with Pool(workers) as pool:
+        return pool.map(score_chunk, chunks(path, total, num_chunks, hand_class))
+
+
+def main():
+    """
+        Re-classifies a hand log and prints the label frequencies
+    """
+    parser = argparse.ArgumentParser(description='Re-classify the hands in a hand log.')
+    parser.add_argument('path', help='hand log written by handlog.HandLogWriter')
+    parser.add_argument('--workers', type=int, help='number of processes; by default, one per CPU')
+    parser.add_argument('--chunks', type=int, help='number of chunks; by default, 16 per worker')
+    parser.add_argument('--json', help='write the per-chunk results to this JSON file')
+    args = parser.parse_args()
+
+    results = rescore(args.path, args.workers, args.chunks)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    lhist, total = merge(results)
+    poker.print_report(lhist, total)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+    This module contains NumPy-backed random number generators for Deck.shuffle
+
+    Deck.shuffle only needs an object with shuffle and randrange methods, so it can
+    use the random module, a random.Random, or a CounterRandom from here.  A
+    CounterRandom draws from a counter-based bit generator (Philox by default), so
+    any number of independent, reproducible streams can be spawned from one seed,
+    and it hands out random integers from a bulk buffer rather than one call at a
+    time.
+
+    Note: Using Python 3.9.0
+"""
+import numpy as np
+
+
+class CounterRandom:
+    """
+        Adapts a NumPy bit generator to the part of random.Random that decks use
+
+        attributes:
+            seed_sequence: numpy.random.SeedSequence; the source of this stream and its children
+            generator: numpy.random.Generator
+    """
+    def __init__(self, seed=None, bit_generator=np.random.Philox, buffer_size=4096):
+        """
+            Initializes the stream
+
+            seed: int, or numpy.random.SeedSequence; by default, fresh entropy
+            bit_generator: a numpy.random.BitGenerator class, such as Philox or PCG64
+            buffer_size: number of random integers drawn at a time
+        """
+        if isinstance(seed, np.random.SeedSequence):
+            self.seed_sequence = seed
+        else:
+            self.seed_sequence = np.random.SeedSequence(seed)
+        self.bit_generator = bit_generator
+        self.generator = np.random.Generator(bit_generator(self.seed_sequence))
+        self.buffer_size = buffer_size
+        self.buffer = []
+
+
+    def spawn(self, n):
+        """
+            Creates independent child streams, such as one per worker process
+
+            n: int
+
+            return: list of CounterRandom
+        """
+        return [CounterRandom(child, self.bit_generator, self.buffer_size)
+                for child in self.seed_sequence.spawn(n)]
+
+
+    def randrange(self, n):
+        """
+            Returns a random integer in range(n)
+
+            n: int
+
+            return: int
+        """
+        if not self.buffer:
+            # full 64-bit integers whatever the width of the bit generator's raw
+            # output, which is only 32 bits for MT19937
+            self.buffer = self.generator.integers(0, 2**64, self.buffer_size, dtype=np.uint64).tolist()
+        # scale a 64-bit integer into range(n); the bias is below n / 2**64
+        return (self.buffer.pop() * n) >> 64
+
+
+    def shuffle(self, x):
+        """
+            Shuffles a list in place with a single bulk permutation
+
+            x: list
+        """
+        x[:] = [x[i] for i in self.generator.permutation(len(x)).tolist()]
+
+
+    def sample(self, population, k):
+        """
+            Chooses k distinct elements of a sequence, in random order
+
+            population: sequence
+            k: int
+
+            return: list
+        """
+        return [population[i] for i in self.generator.choice(len(population), k, replace=False).tolist()]
+
+
+    def permutations(self, num, n=52):
+        """
+            Draws many permutations at once, such as the orders of num whole decks
+
+            num: number of permutations
+            n: length of each permutation
+
+            return: array of shape (num, n)
+        """
+        return self.generator.permuted(np.tile(np.arange(n, dtype=np.uint8), (num, 1)), axis=1)
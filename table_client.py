@@ -0,0 +1,120 @@
+"""
+    This module contains a load-generating client for table_server
+
+    Each connection keeps a window of requests in flight against random tables,
+    mixing deals and showdowns, and records the latency of every response.
+    At the end it prints the throughput and the p50/p99 latencies.
+
+    Note: Using Python 3.9.0
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+
+def percentile(values, p):
+    """
+        Finds a percentile of a list of numbers
+
+        values: sorted list of numbers
+        p: float; between 0 and 100
+
+        return: number
+    """
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def run_connection(host, port, tables, window, deadline, latencies, errors):
+    """
+        Sends requests over one connection until the deadline
+
+        host: string
+        port: int
+        tables: number of tables to spread the requests over
+        window: number of requests in flight at once
+        deadline: time.perf_counter value at which to stop sending
+        latencies: list; the latency of each response, in seconds, is appended
+        errors: list; the error of each failed request is appended
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    rng = random.Random()
+    sent = {}
+    next_id = 0
+    dealt = set()
+
+    def send():
+        nonlocal next_id
+        table = rng.randrange(tables)
+        if table in dealt and rng.random() < 0.5:
+            request = {'id': next_id, 'op': 'showdown', 'table': table}
+        else:
+            request = {'id': next_id, 'op': 'deal', 'table': table, 'num_cards': 7, 'num_hands': 6}
+            dealt.add(table)
+        sent[next_id] = time.perf_counter()
+        next_id += 1
+        writer.write((json.dumps(request) + "\n").encode())
+
+    for i in range(window):
+        send()
+    while sent:
+        line = await reader.readline()
+        if not line:
+            break
+        response = json.loads(line)
+        latencies.append(time.perf_counter() - sent.pop(response['id']))
+        if 'error' in response:
+            errors.append(response['error'])
+        if time.perf_counter() < deadline:
+            send()
+    writer.close()
+
+
+async def run(host, port, connections, tables, window, duration):
+    """
+        Runs the load test
+
+        host: string
+        port: int
+        connections: number of connections
+        tables: number of tables
+        window: requests in flight per connection
+        duration: seconds to keep sending
+
+        return: tuple (latencies, errors, elapsed seconds)
+    """
+    latencies = []
+    errors = []
+    start = time.perf_counter()
+    await asyncio.gather(*[run_connection(host, port, tables, window, start + duration, latencies, errors)
+                           for i in range(connections)])
+    return latencies, errors, time.perf_counter() - start
+
+
+def main():
+    """
+        Runs a load test and prints the results
+    """
+    parser = argparse.ArgumentParser(description='Generate load against table_server and measure latency.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--connections', type=int, default=8)
+    parser.add_argument('--tables', type=int, default=1000)
+    parser.add_argument('--window', type=int, default=32, help='requests in flight per connection')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds to keep sending')
+    args = parser.parse_args()
+
+    latencies, errors, elapsed = asyncio.run(
+        run(args.host, args.port, args.connections, args.tables, args.window, args.duration))
+    latencies.sort()
+    print('%d requests in %.2f seconds: %.0f per second' % (len(latencies), elapsed, len(latencies) / elapsed))
+    print('latency p50 %.3f ms, p99 %.3f ms' % (percentile(latencies, 50) * 1e3, percentile(latencies, 99) * 1e3))
+    if errors:
+        print('%d errors, for example: %s' % (len(errors), errors[0]))
+
+
+if __name__ == '__main__':
+    main()
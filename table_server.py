@@ -0,0 +1,275 @@
+"""
+    This module contains an asyncio server that hosts many virtual poker tables
+
+    Clients connect over a local TCP socket and send one JSON request per line:
+
+        {"id": 1, "op": "deal", "table": 7, "num_cards": 2, "num_hands": 6}
+        {"id": 2, "op": "showdown", "table": 7, "board": [0, 13, 26, 39, 5]}
+        {"id": 3, "op": "classify", "cards": [0, 1, 2, 3, 4]}
+
+    Cards are ordinals (see Card.ordinal).  Each response is one JSON line with
+    the same id.  Requests are not handled as they arrive: they are queued, and
+    once per event-loop tick every queued request, from every connection and
+    table, is handled in one batch and the responses are written together.
+
+    Note: Using Python 3.9.0
+"""
+import argparse
+import asyncio
+import json
+
+import evaluator
+from poker import Card, PokerDeck, PokerHand
+
+
+class Table:
+    """
+        Represents a virtual table: a deck and the hands last dealt from it
+
+        attributes:
+            deck: PokerDeck
+            hands: list of PokerHand; reused for every deal
+    """
+    def __init__(self):
+        """
+            Initializes a table with no hands dealt
+        """
+        self.deck = PokerDeck()
+        self.hands = []
+
+
+    def deal(self, num_cards=2, num_hands=6):
+        """
+            Shuffles the deck and deals new hands
+
+            num_cards: cards per hand
+            num_hands: number of hands
+
+            return: dict; the cards and labels of each hand
+        """
+        for name, value in (('num_cards', num_cards), ('num_hands', num_hands)):
+            if not (isinstance(value, int) and value >= 1):
+                raise ValueError("%s must be a positive integer, not %r" % (name, value))
+        if num_cards * num_hands > 52:
+            raise ValueError("cannot deal %d hands of %d cards" % (num_hands, num_cards))
+        while len(self.hands) < num_hands:
+            self.hands.append(PokerHand())
+        del self.hands[num_hands:]
+
+        self.deck.reset()
+        self.deck.shuffle(num=num_cards * num_hands)
+        self.deck.deal_into(self.hands, num_cards)
+        return {'hands': [[card.ordinal for card in hand.cards] for hand in self.hands],
+                'labels': [hand.labels for hand in self.hands]}
+
+
+    def showdown(self, board=()):
+        """
+            Finds the winners among the hands last dealt
+
+            board: list of at most 5 card ordinals shared by all the hands, none of
+                them dealt to the hands
+
+            return: dict; the indices of the winning hands
+        """
+        if not self.hands:
+            raise ValueError("no hands have been dealt at this table")
+        if len(board) > 5:
+            raise ValueError("a board has at most 5 cards, not %d" % len(board))
+        board_mask = card_mask(board)
+        if evaluator.card_count(board_mask) != len(board):
+            raise ValueError("the board holds a card more than once")
+        dealt = 0
+        for hand in self.hands:
+            dealt |= hand.mask
+        if board_mask & dealt:
+            raise ValueError("the board holds a card that was dealt to a hand")
+        keys = [evaluator.strength(hand.mask | board_mask) for hand in self.hands]
+        return {'winners': evaluator.winners(keys)}
+
+
+def card_mask(cards):
+    """
+        Computes the card mask of a list of card ordinals, checking them
+
+        cards: list of int
+
+        return: int
+    """
+    mask = 0
+    for ordinal in cards:
+        if not (isinstance(ordinal, int) and 0 <= ordinal < 52):
+            raise ValueError("invalid card %r" % (ordinal,))
+        mask |= 1 << ordinal
+    return mask
+
+
+def classify(cards):
+    """
+        Classifies a hand given as card ordinals
+
+        cards: list of distinct card ordinals
+
+        return: dict; the labels of the hand
+    """
+    if evaluator.card_count(card_mask(cards)) != len(cards):
+        raise ValueError("the hand holds a card more than once")
+    hand = PokerHand()
+    for ordinal in cards:
+        hand.add_card(Card.from_ordinal(ordinal))
+    hand.classify()
+    return {'labels': hand.labels}
+
+
+class TableServer:
+    """
+        Serves deal, classify and showdown requests for many tables
+
+        attributes:
+            tables: map from table id to Table
+            pending: list of (request, writer) waiting for the next batch
+            scheduled: boolean; True if a batch is scheduled for the next tick
+            handled: number of requests handled
+            batches: number of batches handled
+    """
+    def __init__(self):
+        """
+            Initializes a server with no tables
+        """
+        self.tables = {}
+        self.pending = []
+        self.scheduled = False
+        self.handled = 0
+        self.batches = 0
+
+
+    def table(self, table_id):
+        """
+            Finds a table, creating it on first use
+
+            table_id: int or string
+
+            return: Table
+        """
+        table = self.tables.get(table_id)
+        if table is None:
+            table = self.tables[table_id] = Table()
+        return table
+
+
+    def handle(self, request):
+        """
+            Handles one request
+
+            request: dict
+
+            return: dict; the response
+        """
+        op = request.get('op')
+        if op == 'deal':
+            result = self.table(request['table']).deal(request.get('num_cards', 2), request.get('num_hands', 6))
+        elif op == 'showdown':
+            result = self.table(request['table']).showdown(request.get('board', ()))
+        elif op == 'classify':
+            result = classify(request['cards'])
+        else:
+            raise ValueError("unknown op %r" % op)
+        result['id'] = request.get('id')
+        return result
+
+
+    def submit(self, request, writer):
+        """
+            Queues a request for the next batch
+
+            request: dict
+            writer: asyncio.StreamWriter to send the response to
+        """
+        self.pending.append((request, writer))
+        if not self.scheduled:
+            self.scheduled = True
+            asyncio.get_running_loop().call_soon(self.flush)
+
+
+    def flush(self):
+        """
+            Handles every queued request and writes the responses, one write per connection
+        """
+        pending, self.pending = self.pending, []
+        self.scheduled = False
+
+        out = {}
+        for request, writer in pending:
+            try:
+                response = self.handle(request)
+            except Exception as e:
+                # one bad request must not cost the rest of the batch their responses
+                response = {'id': request.get('id'), 'error': '%s: %s' % (type(e).__name__, e)}
+            out.setdefault(writer, []).append(json.dumps(response))
+
+        for writer, lines in out.items():
+            if not writer.is_closing():
+                writer.write(("\n".join(lines) + "\n").encode())
+        self.handled += len(pending)
+        self.batches += 1
+
+
+    async def serve_client(self, reader, writer):
+        """
+            Reads requests from one connection until it closes
+
+            reader: asyncio.StreamReader
+            writer: asyncio.StreamWriter
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("a request must be a JSON object")
+                except ValueError as e:
+                    writer.write((json.dumps({'id': None, 'error': 'ValueError: %s' % e}) + "\n").encode())
+                    continue
+                self.submit(request, writer)
+                # stop reading while the client is not keeping up with its responses
+                if writer.transport.get_write_buffer_size() > 1 << 20:
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+    async def serve(self, host='127.0.0.1', port=8765):
+        """
+            Accepts connections until cancelled
+
+            host: string
+            port: int
+        """
+        server = await asyncio.start_server(self.serve_client, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    """
+        Runs the server
+    """
+    parser = argparse.ArgumentParser(description='Serve deals, classifications and showdowns for many tables.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    print('serving on %s:%d' % (args.host, args.port))
+    try:
+        asyncio.run(TableServer().serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""
+    This module checks PokerHand.classify against the original rules
+
+    baseline_labels is the classification poker.py started with: histograms of
+    suits and ranks, and each has_* check in turn.  Every way classify can run,
+    on the evaluator or on the predicates, in full or best only, must give the
+    same labels, and labels must never be left over from earlier cards; a
+    patched has_* check must be used in place of the evaluator.  Run it with
+
+        python -m unittest test_classify
+
+    Note: Using Python 3.9.0
+"""
+import random
+import unittest
+
+import evaluator
+import poker
+from poker import Card, PokerDeck, PokerHand
+
+
+def baseline_labels(cards):
+    """
+        Classifies cards the way the original PokerHand.classify did
+
+        cards: list of Card
+
+        return: list of string; in all_labels order
+    """
+    def in_a_row(ranks):
+        count = 0
+        for i in range(1, 15):
+            if ranks.get(i, 0):
+                count += 1
+                if count == 5:
+                    return True
+            else:
+                count = 0
+        return False
+
+    def straight(cards):
+        ranks = {}
+        for card in cards:
+            ranks[card.rank] = ranks.get(card.rank, 0) + 1
+        ranks[14] = ranks.get(1, 0)
+        return in_a_row(ranks)
+
+    suits = {}
+    ranks = {}
+    for card in cards:
+        suits[card.suit] = suits.get(card.suit, 0) + 1
+        ranks[card.rank] = ranks.get(card.rank, 0) + 1
+    sets = sorted(ranks.values(), reverse=True)
+
+    def check_sets(*t):
+        return all(need <= have for need, have in zip(t, sets))
+
+    by_suit = {}
+    for card in cards:
+        by_suit.setdefault(card.suit, []).append(card)
+
+    checks = {
+        'straightflush': any(len(hand) >= 5 and straight(hand) for hand in by_suit.values()),
+        'fourkind': check_sets(4),
+        'fullhouse': check_sets(3, 2),
+        'flush': any(val >= 5 for val in suits.values()),
+        'straight': straight(cards),
+        'threekind': check_sets(3),
+        'twopair': check_sets(2, 2),
+        'pair': check_sets(2),
+        'highcard': bool(len(cards)),
+    }
+    return [label for label in PokerHand.all_labels if checks[label]]
+
+
+def random_hands(seed, count, sizes=range(0, 10)):
+    """
+        Deals hands of random sizes
+
+        return: generator of list of Card
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        yield [Card.from_ordinal(ordinal) for ordinal in rng.sample(range(52), rng.choice(sizes))]
+
+
+class PredicateHand(PokerHand):
+    """
+        A PokerHand that always classifies with the has_* predicates
+    """
+    evaluator_enabled = False
+
+
+def make_hand(cards, hand_class=PokerHand):
+    """
+        return: hand_class holding the cards
+    """
+    hand = hand_class()
+    for card in cards:
+        hand.add_card(card)
+    return hand
+
+
+class TestClassify(unittest.TestCase):
+
+    def test_evaluator_path_matches_baseline(self):
+        for cards in random_hands(1, 20000):
+            hand = make_hand(cards)
+            hand.classify()
+            self.assertEqual(hand.labels, baseline_labels(cards), cards)
+
+    def test_predicate_path_matches_baseline(self):
+        for cards in random_hands(2, 5000):
+            hand = make_hand(cards, PredicateHand)
+            hand.classify()
+            self.assertEqual(hand.labels, baseline_labels(cards), cards)
+
+    def test_best_only(self):
+        for cards in random_hands(3, 5000):
+            expected = baseline_labels(cards)
+            best = expected[0] if expected else None
+            for hand_class in (PokerHand, PredicateHand):
+                hand = make_hand(cards, hand_class)
+                self.assertEqual(hand.classify(best_only=True), best, cards)
+                self.assertEqual(hand.labels, expected, cards)
+
+    def test_labels_follow_the_cards(self):
+        deck = PokerDeck()
+        hands = [PokerHand() for i in range(6)]
+        rng = random.Random(5)
+        for i in range(200):
+            deck.reset()
+            deck.shuffle(rng)
+            deck.deal_into(hands, 7, classify=i % 2 == 0)
+            for hand in hands:
+                self.assertEqual(hand.labels, baseline_labels(hand.cards))
+
+    def test_pop_a_duplicate_card(self):
+        ace = Card(2, 1)
+        hand = make_hand([ace] + [Card(2, rank) for rank in (13, 12, 11, 10)] + [ace])
+        hand.classify()
+        self.assertEqual(hand.pop_card(), ace)
+        hand.classify()
+        self.assertEqual(hand.labels, baseline_labels(hand.cards))
+        self.assertTrue(hand.has_straightflush())
+        self.assertEqual(hand.strength() >> 20, evaluator.STRAIGHTFLUSH)
+
+    def test_patched_predicate_is_used(self):
+        cards = [Card.from_ordinal(ordinal) for ordinal in (0, 13, 2, 3, 4, 5, 20)]
+        stock = vars(PokerHand)['has_pair']
+        PokerHand.has_pair = lambda self: False
+        try:
+            self.assertFalse(PokerHand().uses_evaluator())
+            hand = make_hand(cards)
+            hand.classify()
+            self.assertNotIn('pair', hand.labels)
+        finally:
+            PokerHand.has_pair = stock
+        hand = make_hand(cards)
+        hand.classify()
+        self.assertTrue(hand.uses_evaluator())
+        self.assertIn('pair', hand.labels)
+
+    def test_wrapped_predicate_keeps_the_evaluator(self):
+        stock = vars(PokerHand)['has_pair']
+
+        def has_pair(self):
+            return stock(self)
+        has_pair.__wrapped__ = stock
+
+        PokerHand.has_pair = has_pair
+        try:
+            self.assertTrue(PokerHand().uses_evaluator())
+        finally:
+            PokerHand.has_pair = stock
+
+    def test_find_defining_class_of_a_plain_class(self):
+        class Base:
+            def method(self):
+                pass
+
+        class Derived(Base):
+            pass
+
+        self.assertIs(poker.find_defining_class(Derived(), 'method'), Base)
+        Derived.method = Base.method
+        self.assertIs(poker.find_defining_class(Derived(), 'method'), Derived)
+
+    def test_predicates_after_classify(self):
+        for cards in random_hands(4, 2000, range(5, 10)):
+            hand = make_hand(cards)
+            hand.classify()
+            found = [label for label in PokerHand.all_labels if getattr(hand, 'has_' + label)()]
+            self.assertEqual(found, baseline_labels(cards), cards)
+
+
+if __name__ == '__main__':
+    unittest.main()
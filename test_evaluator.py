@@ -0,0 +1,134 @@
+"""
+    This module checks the table-driven evaluator against brute force
+
+    The strength key of a hand of seven cards must be the best key of its 21
+    five-card hands, and the keys of five-card hands must order them the same way
+    as a plain, independent ranking by category and ranks, and showdown must
+    pick the hands with the largest key.  Run it with
+
+        python -m unittest test_evaluator
+
+    Note: Using Python 3.9.0
+"""
+import itertools
+import random
+import unittest
+
+import evaluator
+import exact
+import poker
+import ranktable
+
+
+def reference_rank(ordinals):
+    """
+        Ranks a five-card hand the long way, independently of evaluator
+
+        ordinals: list of 5 card ordinals
+
+        return: tuple (category, ranks); of two hands, the larger tuple wins
+    """
+    suits = [ordinal // 13 for ordinal in ordinals]
+    # the ace is 14
+    ranks = [ordinal % 13 + 1 if ordinal % 13 else 14 for ordinal in ordinals]
+    counts = {rank: ranks.count(rank) for rank in ranks}
+    # the ranks, most common first, then highest first
+    order = sorted(counts, key=lambda rank: (counts[rank], rank), reverse=True)
+    shape = sorted(counts.values(), reverse=True)
+
+    flush = len(set(suits)) == 1
+    straight = None
+    if len(counts) == 5:
+        high = max(ranks)
+        if high - min(ranks) == 4:
+            straight = high
+        elif sorted(ranks) == [2, 3, 4, 5, 14]:
+            straight = 5
+
+    if straight and flush:
+        return evaluator.STRAIGHTFLUSH, [straight]
+    if shape == [4, 1]:
+        return evaluator.FOURKIND, order
+    if shape == [3, 2]:
+        return evaluator.FULLHOUSE, order
+    if flush:
+        return evaluator.FLUSH, order
+    if straight:
+        return evaluator.STRAIGHT, [straight]
+    if shape == [3, 1, 1]:
+        return evaluator.THREEKIND, order
+    if shape == [2, 2, 1]:
+        return evaluator.TWOPAIR, order
+    if shape == [2, 1, 1, 1]:
+        return evaluator.PAIR, order
+    return evaluator.HIGHCARD, order
+
+
+def mask_of(ordinals):
+    """
+        return: int; the card mask of a list of card ordinals
+    """
+    mask = 0
+    for ordinal in ordinals:
+        mask |= 1 << ordinal
+    return mask
+
+
+def sign(x):
+    """
+        return: -1, 0 or 1
+    """
+    return (x > 0) - (x < 0)
+
+
+class TestStrength(unittest.TestCase):
+
+    def test_five_cards_order_like_the_reference(self):
+        rng = random.Random(1)
+        for i in range(20000):
+            a = rng.sample(range(52), 5)
+            b = rng.sample(range(52), 5)
+            ka = evaluator.strength(mask_of(a))
+            kb = evaluator.strength(mask_of(b))
+            ra = reference_rank(a)
+            rb = reference_rank(b)
+            self.assertEqual(ka >> 20, ra[0], a)
+            self.assertEqual(sign(ka - kb), sign((ra > rb) - (ra < rb)), (a, b))
+
+    def test_seven_cards_are_the_best_of_21(self):
+        rng = random.Random(2)
+        for i in range(5000):
+            ordinals = rng.sample(range(52), 7)
+            best = max(evaluator.strength(mask_of(five)) for five in itertools.combinations(ordinals, 5))
+            self.assertEqual(evaluator.strength(mask_of(ordinals)), best, ordinals)
+
+    def test_category_agrees_with_evaluate(self):
+        rng = random.Random(3)
+        for i in range(5000):
+            mask = mask_of(rng.sample(range(52), rng.randrange(5, 10)))
+            self.assertEqual(evaluator.strength(mask) >> 20, evaluator.category(evaluator.evaluate(mask)))
+
+    def test_rank_table_index(self):
+        rng = random.Random(4)
+        for i in range(5000):
+            ordinals = sorted(rng.sample(range(52), 5))
+            self.assertEqual(ranktable.mask_rank(mask_of(ordinals)), exact.rank(ordinals))
+
+
+class TestShowdown(unittest.TestCase):
+
+    def test_showdown_matches_strength(self):
+        deck = poker.PokerDeck()
+        rng = random.Random(6)
+        for i in range(1000):
+            deck.reset()
+            deck.shuffle(rng)
+            hands = deck.deal_hands(2, 4)
+            board = [deck.pop_card() for j in range(5)]
+            keys = [hand.strength(board) for hand in hands]
+            winners = poker.showdown(hands, board)
+            self.assertEqual(winners, [hand for hand, key in zip(hands, keys) if key == max(keys)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+    This module checks that hand logs read back what was written, and that
+    rescoring a log counts the same labels as classifying its hands one by one
+
+    Run it with
+
+        python -m unittest test_handlog
+
+    Note: Using Python 3.9.0
+"""
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+import handlog
+import rescore
+from poker import PokerDeck, PokerHand
+
+
+class NoPairHand(PokerHand):
+    """
+        A PokerHand whose rules have no pairs, to rescore with changed rules
+    """
+    def has_pair(self):
+        return False
+
+
+def deal(seed, count, num_cards):
+    """
+        Deals hands from freshly shuffled decks
+
+        return: list of list of Card
+    """
+    deck = PokerDeck()
+    rng = random.Random(seed)
+    hands = []
+    for i in range(count):
+        deck.reset()
+        deck.shuffle(rng)
+        hands.append([deck.pop_card() for j in range(num_cards)])
+    return hands
+
+
+def classify_all(hands, hand_class=PokerHand):
+    """
+        Counts the labels of hands one by one
+
+        return: dict; map from label to number of hands
+    """
+    counts = {}
+    for cards in hands:
+        hand = hand_class()
+        for card in cards:
+            hand.add_card(card)
+        hand.classify()
+        for label in hand.labels:
+            counts[label] = counts.get(label, 0) + 1
+    return counts
+
+
+class TestHandLog(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'hands.log')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_cards_round_trip(self):
+        hands = deal(1, 300, 7)
+        with handlog.HandLogWriter(self.path, 7, buffer_size=100) as writer:
+            writer.write_hands(hands)
+        with handlog.HandLog(self.path) as log:
+            self.assertEqual(len(log), len(hands))
+            self.assertEqual(log.kind, handlog.CARDS)
+            for i, cards in enumerate(hands):
+                self.assertEqual(log.ordinals(i), [card.ordinal for card in cards])
+                self.assertEqual(log.records[i, 0], cards[0].ordinal)
+                self.assertEqual(log.hand(i).cards, cards)
+
+    def test_mask_round_trip(self):
+        hands = deal(2, 300, 5)
+        with handlog.HandLogWriter(self.path, 5, handlog.MASK) as writer:
+            writer.write_hands(hands)
+        with handlog.HandLog(self.path) as log:
+            self.assertEqual(len(log), len(hands))
+            self.assertEqual(log.kind, handlog.MASK)
+            for i, cards in enumerate(hands):
+                ordinals = sorted(card.ordinal for card in cards)
+                self.assertEqual(log.ordinals(i), ordinals)
+                self.assertEqual(log.mask(i), sum(1 << ordinal for ordinal in ordinals))
+
+    def test_empty_log(self):
+        handlog.HandLogWriter(self.path, 5).close()
+        with handlog.HandLog(self.path) as log:
+            self.assertEqual(len(log), 0)
+            self.assertEqual(list(log.hands()), [])
+
+    def test_close_while_a_view_is_held(self):
+        with handlog.HandLogWriter(self.path, 5) as writer:
+            writer.write_hands(deal(3, 10, 5))
+        log = handlog.HandLog(self.path)
+        view = np.asarray(log.records)
+        with self.assertRaises(BufferError):
+            log.close()
+        # the log is still usable, and closes once the view is gone
+        self.assertEqual(list(view[0]), log.ordinals(0))
+        del view
+        log.close()
+        log.close()
+
+
+class TestRescore(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'hands.log')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def check(self, hands, kind, hand_class=PokerHand):
+        with handlog.HandLogWriter(self.path, len(hands[0]), kind) as writer:
+            writer.write_hands(hands)
+        lhist, total = rescore.merge(rescore.rescore(self.path, 2, 5, hand_class))
+        self.assertEqual(total, len(hands))
+        self.assertEqual(dict(lhist.items()), classify_all(hands, hand_class))
+
+    def test_evaluator_path(self):
+        self.check(deal(4, 1000, 7), handlog.CARDS)
+        self.check(deal(5, 1000, 7), handlog.MASK)
+
+    def test_predicate_path(self):
+        self.check(deal(6, 1000, 3), handlog.CARDS)
+
+    def test_changed_rules(self):
+        hands = deal(7, 1000, 7)
+        self.check(hands, handlog.CARDS, NoPairHand)
+        self.assertNotIn('pair', classify_all(hands, NoPairHand))
+
+
+if __name__ == '__main__':
+    unittest.main()
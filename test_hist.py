@@ -0,0 +1,99 @@
+"""
+    This module checks that ArrayHist reads like Hist
+
+    The same counts, made the same way, must give the same lookups, views and
+    comparisons in both, with keys whose count is zero left out.  Run it with
+
+        python -m unittest test_hist
+
+    Note: Using Python 3.9.0
+"""
+import random
+import unittest
+
+from poker import ArrayHist, Hist, PokerHand
+
+
+KEYS = PokerHand.all_labels
+
+
+def random_counts(seed, n=200):
+    """
+        Counts random keys up and down in a Hist and an ArrayHist
+
+        return: tuple (Hist, ArrayHist)
+    """
+    rng = random.Random(seed)
+    hist = Hist()
+    ahist = ArrayHist(KEYS)
+    for i in range(n):
+        x = rng.choice(KEYS)
+        f = rng.choice((1, 1, 2, -1))
+        hist.count(x, f)
+        ahist.count(x, f)
+    return hist, ahist
+
+
+class TestArrayHist(unittest.TestCase):
+
+    def check_same(self, hist, ahist):
+        self.assertEqual(sorted(ahist.items()), sorted(hist.items()))
+        self.assertEqual(sorted(ahist.keys()), sorted(hist.keys()))
+        self.assertEqual(sorted(ahist.values()), sorted(hist.values()))
+        self.assertEqual(sorted(ahist), sorted(hist))
+        self.assertEqual(len(ahist), len(hist))
+        for x in KEYS + ['nothing']:
+            self.assertEqual(ahist.get(x), hist.get(x))
+            self.assertEqual(ahist.get(x, 0), hist.get(x, 0))
+            self.assertEqual(x in ahist, x in hist)
+            if x in hist:
+                self.assertEqual(ahist[x], hist[x])
+            else:
+                with self.assertRaises(KeyError):
+                    ahist[x]
+        self.assertTrue(ahist == hist)
+        self.assertTrue(ahist == dict(hist))
+
+    def test_views_match_hist(self):
+        for seed in range(20):
+            hist, ahist = random_counts(seed)
+            self.check_same(hist, ahist)
+
+    def test_counting_down_to_zero(self):
+        hist = Hist(['pair', 'pair', 'flush'])
+        ahist = ArrayHist(KEYS, ['pair', 'pair', 'flush'])
+        hist.count('flush', -1)
+        ahist.count('flush', -1)
+        self.check_same(hist, ahist)
+        self.assertNotIn('flush', ahist)
+
+    def test_equality(self):
+        hist, ahist = random_counts(1)
+        other = ahist.copy()
+        self.assertTrue(other == ahist)
+        other.count('highcard')
+        self.assertFalse(other == ahist)
+        self.assertFalse(other == hist)
+        self.assertTrue(ArrayHist(KEYS) == {})
+        self.assertFalse(ahist == 3)
+
+    def test_update(self):
+        for seed in range(10):
+            hist, ahist = random_counts(seed)
+            more, amore = random_counts(seed + 100)
+            expected = Hist()
+            for source in (hist, more):
+                for x, f in source.items():
+                    expected.count(x, f)
+            # another layout of the same keys takes the general path of update
+            reordered = ArrayHist(tuple(reversed(KEYS)))
+            reordered.update(more)
+            for other in (more, dict(more), amore, reordered):
+                result = ahist.copy()
+                result.update(other)
+                self.check_same(expected, result)
+            self.check_same(hist, ahist)
+
+
+if __name__ == '__main__':
+    unittest.main()
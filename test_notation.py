@@ -0,0 +1,60 @@
+"""
+    This module checks that the card notation reads back what it writes
+
+    Every card code must parse to the card it was formatted from, in each of its
+    accepted spellings, and anything else must be rejected.  Run it with
+
+        python -m unittest test_notation
+
+    Note: Using Python 3.9.0
+"""
+import random
+import unittest
+
+import card
+import deal_hands
+import notation
+import poker
+
+
+class TestNotation(unittest.TestCase):
+
+    def test_ordinals_round_trip(self):
+        self.assertEqual(notation.parse_ordinals(notation.format_ordinals(range(52))), list(range(52)))
+        rng = random.Random(1)
+        for i in range(1000):
+            ordinals = rng.sample(range(52), rng.randrange(0, 10))
+            self.assertEqual(notation.parse_ordinals(notation.format_ordinals(ordinals)), ordinals)
+
+    def test_hands_round_trip(self):
+        rng = random.Random(2)
+        rows = [rng.sample(range(52), 7) for i in range(100)]
+        self.assertEqual(notation.decode_hands(notation.encode_hands(rows)), rows)
+        hand = notation.parse_hand(notation.format_ordinals(rows[0]))
+        self.assertEqual(notation.format_cards(hand), notation.format_ordinals(rows[0]))
+
+    def test_other_spellings(self):
+        self.assertEqual(notation.parse_ordinal('Th'), notation.parse_ordinal('10h'))
+        self.assertEqual(notation.parse_ordinal('Ah'), notation.parse_ordinal('ah'))
+        self.assertEqual(notation.parse_ordinals('10h ah kd'), notation.parse_ordinals('Th Ah Kd'))
+        self.assertEqual(notation.format_ordinals(notation.parse_ordinals('10h ah')), 'Th Ah')
+
+    def test_invalid_codes(self):
+        for code in ('', '1h', 'Ax', 'AH', '11h', 'Ahh', 'h'):
+            with self.assertRaises(ValueError):
+                notation.parse_ordinal(code)
+        with self.assertRaises(ValueError):
+            notation.parse_ordinals('Ah Kd Zz')
+        with self.assertRaises(ValueError):
+            notation.parse_hand('Ah 1d')
+
+    def test_card_classes(self):
+        for module in (card, deal_hands, poker):
+            cards = notation.parse_cards('Ah Kd', module.Card)
+            self.assertTrue(all(type(c) is module.Card for c in cards))
+        hand = notation.parse_hand('Ah Kd', deal_hands.Hand, deal_hands.Card)
+        self.assertTrue(all(type(c) is deal_hands.Card for c in hand.cards))
+
+
+if __name__ == '__main__':
+    unittest.main()
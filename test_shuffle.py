@@ -0,0 +1,69 @@
+"""
+    This module checks that partial shuffles deal like full ones
+
+    Deck.shuffle with num shuffles only the last num cards; every ordered choice
+    of the cards dealt must be equally likely, and with num as large as the deck
+    it must be the same as a full shuffle.  Run it with
+
+        python -m unittest test_shuffle
+
+    Note: Using Python 3.9.0
+"""
+import itertools
+import random
+import unittest
+
+import numpy as np
+
+import rngs
+from poker import Deck
+
+
+def small_deck(size):
+    """
+        return: Deck holding only its first size cards
+    """
+    deck = Deck()
+    deck.cards[:] = deck.cards[:size]
+    return deck
+
+
+def chi_square(counts, expected):
+    """
+        return: float; Pearson's statistic of counts against a common expected count
+    """
+    return sum((count - expected) ** 2 / expected for count in counts)
+
+
+class TestShuffle(unittest.TestCase):
+
+    def check_uniform(self, rng):
+        size, num, trials = 6, 3, 24000
+        deck = small_deck(size)
+        start = list(deck.cards)
+        counts = dict.fromkeys(itertools.permutations(range(size), num), 0)
+        for i in range(trials):
+            deck.cards[:] = start
+            deck.shuffle(rng, num)
+            counts[tuple(card.ordinal for card in deck.cards[-num:])] += 1
+        # 119 degrees of freedom; the 99.9th percentile is about 173
+        self.assertLess(chi_square(counts.values(), trials / len(counts)), 173)
+
+    def test_partial_shuffle_is_uniform(self):
+        self.check_uniform(random.Random(1))
+
+    def test_partial_shuffle_is_uniform_with_counter_random(self):
+        for bit_generator in (np.random.Philox, np.random.MT19937):
+            self.check_uniform(rngs.CounterRandom(2, bit_generator))
+
+    def test_whole_deck_is_a_full_shuffle(self):
+        for num in (52, 60):
+            deck = Deck()
+            deck.shuffle(random.Random(3), num)
+            cards = Deck().cards
+            random.Random(3).shuffle(cards)
+            self.assertEqual(deck.cards, cards)
+
+
+if __name__ == '__main__':
+    unittest.main()